@@ -1,10 +1,29 @@
 """Marketing Intelligence - Configuration Settings"""
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def _normalize_database_uri(uri: str) -> str:
+    """Handle Render's postgres:// vs postgresql:// scheme."""
+    if uri.startswith('postgres://'):
+        uri = uri.replace('postgres://', 'postgresql://', 1)
+    return uri
+
+
+def _engine_options(uri: str) -> dict:
+    """Engine tuning: a larger compiled-statement cache, plus batched executemany on psycopg2."""
+    options = {'query_cache_size': 1200}
+    if uri.startswith('postgresql'):
+        options.update({
+            'executemany_mode': 'values_plus_batch',
+            'insertmanyvalues_page_size': 1000,
+        })
+    return options
+
+
 class Config:
     """Base configuration."""
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -22,24 +41,20 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///marketing_intelligence.db')
+    SQLALCHEMY_DATABASE_URI = _normalize_database_uri(os.getenv('DATABASE_URL', 'sqlite:///marketing_intelligence.db'))
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
-
-    @property
-    def SQLALCHEMY_DATABASE_URI(self):
-        uri = os.getenv('DATABASE_URL', '')
-        # Handle Render's postgres:// vs postgresql://
-        if uri.startswith('postgres://'):
-            uri = uri.replace('postgres://', 'postgresql://', 1)
-        return uri
+    SQLALCHEMY_DATABASE_URI = _normalize_database_uri(os.getenv('DATABASE_URL', ''))
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
 
 
+@lru_cache(maxsize=None)
 def get_config():
-    """Get configuration based on environment."""
+    """Get configuration based on environment (resolved once per process)."""
     env = os.getenv('FLASK_ENV', 'development')
     if env == 'production':
         return ProductionConfig()
@@ -1,12 +1,19 @@
 """Marketing Intelligence - AI Chat Engine with CMO Conversation Modes"""
+import json
 from enum import Enum
-from typing import Dict, List, Optional, Generator, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Optional, Generator, Any, Tuple
 from .claude_client import ClaudeClient
 from .suggestion_engine import MarketingSuggestionEngine, SuggestedPrompt
 
 
-class ConversationMode(Enum):
-    """CMO-focused conversation modes."""
+class ConversationMode(str, Enum):
+    """CMO-focused conversation modes.
+
+    Members are str instances, so they hash and compare equal to their values
+    and can be used interchangeably with raw mode strings as dict keys.
+    """
     GENERAL = "general"
     CAMPAIGN_ANALYSIS = "campaign_analysis"
     CHANNEL_OPTIMIZATION = "channel_optimization"
@@ -165,20 +172,115 @@ Create actionable plans that align marketing activities with business objectives
 }
 
 
+ANALYSIS_PROMPTS = MappingProxyType({
+    "campaign_performance": "Analyze this campaign performance data and provide insights on what's working, what's not, and specific recommendations for improvement.",
+    "channel_mix": "Analyze this channel performance data and recommend an optimized budget allocation strategy.",
+    "content_effectiveness": "Analyze this content performance data and recommend a content strategy to improve results.",
+    "funnel_optimization": "Analyze this funnel data and identify the biggest opportunities to improve conversion rates.",
+    "roi_analysis": "Analyze this marketing ROI data and recommend ways to improve marketing efficiency.",
+})
+
+DEFAULT_ANALYSIS_PROMPT = "Analyze this marketing data and provide actionable insights."
+
+
+# String-keyed views of the tables above, so the per-turn lookups avoid enum hashing.
+# Only these derived views are cached on first use; the source tables are built at import.
+@lru_cache(maxsize=None)
+def _system_prompts_by_value() -> Dict[str, str]:
+    return {mode.value: prompt for mode, prompt in SYSTEM_PROMPTS.items()}
+
+
+@lru_cache(maxsize=None)
+def _suggested_prompts_by_value() -> Dict[str, Tuple[str, ...]]:
+    return {mode.value: tuple(prompts) for mode, prompts in SUGGESTED_PROMPTS.items()}
+
+
+@lru_cache(maxsize=None)
+def _mode_items() -> Tuple[Tuple[str, str], ...]:
+    return tuple((mode.value, desc) for mode, desc in MODE_DESCRIPTIONS.items())
+
+
+@lru_cache(maxsize=16)
+def _base_system_prompt(mode_value: str) -> str:
+    """Resolve the context-free system prompt for a mode value."""
+    prompts = _system_prompts_by_value()
+    return prompts.get(mode_value, prompts[ConversationMode.GENERAL.value])
+
+
+def _format_organization(org: Dict[str, Any], parts: List[str]) -> None:
+    parts.append(f"**Organization**: {org.get('name', 'Unknown')}")
+    if org.get('industry'):
+        parts.append(f"**Industry**: {org['industry']}")
+    if org.get('annual_marketing_budget'):
+        parts.append(f"**Annual Marketing Budget**: ${org['annual_marketing_budget']:,.0f}")
+
+
+def _format_campaigns(campaigns: List[Dict[str, Any]], parts: List[str]) -> None:
+    parts.append(f"\n**Active Campaigns**: {len(campaigns)}")
+    for c in campaigns[:5]:
+        parts.append(f"- {c.get('name')}: {c.get('status')} (Score: {c.get('overall_score', 'N/A')})")
+
+
+def _format_channels(channels: List[Dict[str, Any]], parts: List[str]) -> None:
+    parts.append(f"\n**Marketing Channels**: {len(channels)}")
+    for ch in channels[:5]:
+        parts.append(f"- {ch.get('name')}: ROAS {ch.get('roas', 0):.0f}%, Score: {ch.get('efficiency_score', 'N/A')}")
+
+
+def _format_metrics(m: Dict[str, Any], parts: List[str]) -> None:
+    parts.append(f"\n**Key Metrics**:")
+    if m.get('cac'):
+        parts.append(f"- CAC: ${m['cac']:.2f}")
+    if m.get('clv'):
+        parts.append(f"- CLV: ${m['clv']:.2f}")
+    if m.get('roas'):
+        parts.append(f"- ROAS: {m['roas']:.0f}%")
+    if m.get('marketing_roi'):
+        parts.append(f"- Marketing ROI: {m['marketing_roi']:.0f}%")
+
+
+def _format_benchmark(b: Dict[str, Any], parts: List[str]) -> None:
+    parts.append(f"\n**Benchmark Summary**:")
+    parts.append(f"- Overall Score: {b.get('overall_score', 'N/A')}")
+    parts.append(f"- Grade: {b.get('grade', 'N/A')}")
+    if b.get('strengths'):
+        parts.append(f"- Strengths: {', '.join(b['strengths'][:3])}")
+
+
+# Context sections in the order they appear in the system prompt
+_CONTEXT_FORMATTERS = (
+    ("organization", _format_organization),
+    ("campaigns", _format_campaigns),
+    ("channels", _format_channels),
+    ("metrics", _format_metrics),
+    ("benchmark", _format_benchmark),
+)
+
+
+@lru_cache(maxsize=32)
+def _context_formatters(keys: frozenset) -> tuple:
+    """Select the section formatters for a context shape, resolved once per shape."""
+    return tuple((key, fn) for key, fn in _CONTEXT_FORMATTERS if key in keys)
+
+
 class ChatEngine:
     """AI-powered chat engine for Marketing Intelligence."""
 
+    # Number of prior messages sent to the model with each turn
+    HISTORY_WINDOW = 10
+
     def __init__(self, claude_client: ClaudeClient = None):
         self.client = claude_client or ClaudeClient()
         self.suggestion_engine = MarketingSuggestionEngine()
 
     def get_modes(self) -> Dict[str, str]:
         """Get available conversation modes with descriptions."""
-        return {mode.value: desc for mode, desc in MODE_DESCRIPTIONS.items()}
+        return dict(_mode_items())
 
-    def get_suggested_prompts(self, mode: ConversationMode) -> List[str]:
-        """Get suggested prompts for a conversation mode."""
-        return SUGGESTED_PROMPTS.get(mode, SUGGESTED_PROMPTS[ConversationMode.GENERAL])
+    def get_suggested_prompts(self, mode: ConversationMode) -> Tuple[str, ...]:
+        """Get suggested prompts for a conversation mode (shared, immutable)."""
+        prompts = _suggested_prompts_by_value()
+        return prompts.get(mode, prompts[ConversationMode.GENERAL.value])
 
     def get_dynamic_suggestions(
         self,
@@ -223,7 +325,7 @@ class ChatEngine:
 
     def _build_system_prompt(self, mode: ConversationMode, context: Dict[str, Any] = None) -> str:
         """Build system prompt with mode and context."""
-        base_prompt = SYSTEM_PROMPTS.get(mode, SYSTEM_PROMPTS[ConversationMode.GENERAL])
+        base_prompt = _base_system_prompt(mode)
 
         if context:
             context_str = self._format_context(context)
@@ -236,11 +338,15 @@ class ChatEngine:
         messages = []
 
         if history:
-            for msg in history[-10:]:  # Keep last 10 messages for context
-                messages.append({
-                    "role": msg.get("role", "user"),
-                    "content": msg.get("content", "")
-                })
+            for msg in history[-self.HISTORY_WINDOW:]:  # Keep last messages for context
+                # Well-formed {"role", "content"} entries are passed through as-is
+                if len(msg) == 2 and "role" in msg and "content" in msg:
+                    messages.append(msg)
+                else:
+                    messages.append({
+                        "role": msg.get("role", "user"),
+                        "content": msg.get("content", "")
+                    })
 
         messages.append({"role": "user", "content": message})
         return messages
@@ -249,62 +355,17 @@ class ChatEngine:
         """Format context data for the system prompt."""
         parts = []
 
-        if "organization" in context:
-            org = context["organization"]
-            parts.append(f"**Organization**: {org.get('name', 'Unknown')}")
-            if org.get('industry'):
-                parts.append(f"**Industry**: {org['industry']}")
-            if org.get('annual_marketing_budget'):
-                parts.append(f"**Annual Marketing Budget**: ${org['annual_marketing_budget']:,.0f}")
-
-        if "campaigns" in context:
-            campaigns = context["campaigns"]
-            parts.append(f"\n**Active Campaigns**: {len(campaigns)}")
-            for c in campaigns[:5]:
-                parts.append(f"- {c.get('name')}: {c.get('status')} (Score: {c.get('overall_score', 'N/A')})")
-
-        if "channels" in context:
-            channels = context["channels"]
-            parts.append(f"\n**Marketing Channels**: {len(channels)}")
-            for ch in channels[:5]:
-                parts.append(f"- {ch.get('name')}: ROAS {ch.get('roas', 0):.0f}%, Score: {ch.get('efficiency_score', 'N/A')}")
-
-        if "metrics" in context:
-            m = context["metrics"]
-            parts.append(f"\n**Key Metrics**:")
-            if m.get('cac'):
-                parts.append(f"- CAC: ${m['cac']:.2f}")
-            if m.get('clv'):
-                parts.append(f"- CLV: ${m['clv']:.2f}")
-            if m.get('roas'):
-                parts.append(f"- ROAS: {m['roas']:.0f}%")
-            if m.get('marketing_roi'):
-                parts.append(f"- Marketing ROI: {m['marketing_roi']:.0f}%")
-
-        if "benchmark" in context:
-            b = context["benchmark"]
-            parts.append(f"\n**Benchmark Summary**:")
-            parts.append(f"- Overall Score: {b.get('overall_score', 'N/A')}")
-            parts.append(f"- Grade: {b.get('grade', 'N/A')}")
-            if b.get('strengths'):
-                parts.append(f"- Strengths: {', '.join(b['strengths'][:3])}")
+        for key, formatter in _context_formatters(frozenset(context)):
+            formatter(context[key], parts)
 
         return "\n".join(parts) if parts else "No additional context available."
 
     def analyze_with_ai(self, data: Dict[str, Any], analysis_type: str) -> str:
         """Perform AI-powered analysis on marketing data."""
-        prompts = {
-            "campaign_performance": "Analyze this campaign performance data and provide insights on what's working, what's not, and specific recommendations for improvement.",
-            "channel_mix": "Analyze this channel performance data and recommend an optimized budget allocation strategy.",
-            "content_effectiveness": "Analyze this content performance data and recommend a content strategy to improve results.",
-            "funnel_optimization": "Analyze this funnel data and identify the biggest opportunities to improve conversion rates.",
-            "roi_analysis": "Analyze this marketing ROI data and recommend ways to improve marketing efficiency.",
-        }
-
-        prompt = prompts.get(analysis_type, "Analyze this marketing data and provide actionable insights.")
-        context = f"Data for analysis:\n```json\n{data}\n```"
+        prompt = ANALYSIS_PROMPTS.get(analysis_type, DEFAULT_ANALYSIS_PROMPT)
+        context = f"Data for analysis:\n```json\n{json.dumps(data, default=str)}\n```"
 
         messages = [{"role": "user", "content": f"{prompt}\n\n{context}"}]
-        system = SYSTEM_PROMPTS[ConversationMode.GENERAL]
+        system = _base_system_prompt(ConversationMode.GENERAL.value)
 
         return self.client.chat(messages, system=system)
@@ -2,9 +2,47 @@
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+import codecs
 import json
 import io
 import csv
+import re
+from functools import lru_cache
+from itertools import chain, islice
+
+
+# Column dtypes reported by ColumnAnalysis
+DTYPE_NUMERIC = 'numeric'
+DTYPE_TEXT = 'text'
+DTYPE_DATE = 'date'
+DTYPE_BOOLEAN = 'boolean'
+
+_NUMERIC_STRIP = str.maketrans('', '', ',$%')
+_BOOL_VALUES = frozenset({'true', 'false', 'yes', 'no', '1', '0'})
+
+_JSON_WS = re.compile(r'[ \t\n\r]*')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _decode_json_array_head(text: str, limit: int) -> List[Any]:
+    """Decode at most `limit` items of a top-level JSON array, leaving the rest unparsed."""
+    items = []
+    idx = _JSON_WS.match(text).end() + 1  # skip '['
+    idx = _JSON_WS.match(text, idx).end()
+    if text.startswith(']', idx):
+        return items
+
+    while len(items) < limit:
+        item, idx = _JSON_DECODER.raw_decode(text, idx)
+        items.append(item)
+        idx = _JSON_WS.match(text, idx).end()
+        if text.startswith(']', idx):
+            break
+        if not text.startswith(',', idx):
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, idx)
+        idx = _JSON_WS.match(text, idx + 1).end()
+
+    return items
 
 
 @dataclass
@@ -34,8 +72,15 @@ class FileAnalysisResult:
     context_json: Dict[str, Any]
     insights: List[str]
     created_at: datetime = field(default_factory=datetime.utcnow)
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
+        # Results are not mutated after analysis; build the payload once
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return self._dict_cache
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             'filename': self.filename,
             'file_type': self.file_type,
@@ -79,6 +124,12 @@ class FileAnalyzer:
         'channel': ['channel', 'source', 'medium', 'platform'],
     }
 
+    # One compiled alternation per metric type, checked in priority order
+    _METRIC_MATCHERS = tuple(
+        (metric_type, re.compile('|'.join(re.escape(p) for p in patterns)))
+        for metric_type, patterns in MARKETING_METRIC_PATTERNS.items()
+    )
+
     def __init__(self):
         pass
 
@@ -110,19 +161,7 @@ class FileAnalyzer:
 
     def _analyze_csv(self, content: bytes, filename: str, delimiter: str = ',') -> FileAnalysisResult:
         """Analyze a CSV file."""
-        try:
-            # Decode content
-            text = content.decode('utf-8-sig')  # Handle BOM
-        except UnicodeDecodeError:
-            text = content.decode('latin-1')
-
-        # Parse CSV
-        reader = csv.DictReader(io.StringIO(text), delimiter=delimiter)
-        rows = []
-        for i, row in enumerate(reader):
-            if i >= self.MAX_ROWS:
-                break
-            rows.append(row)
+        rows = self._read_csv_rows(content, delimiter)
 
         if not rows:
             return self._create_empty_result(filename, 'csv')
@@ -155,9 +194,31 @@ class FileAnalyzer:
             insights=insights
         )
 
+    def _read_csv_rows(self, content: bytes, delimiter: str) -> List[Dict[str, Any]]:
+        """Parse up to MAX_ROWS rows, decoding the bytes incrementally as rows are read."""
+        # Skip a UTF-8 BOM by offset instead of sniffing it through the utf-8-sig codec
+        start = len(codecs.BOM_UTF8) if content.startswith(codecs.BOM_UTF8) else 0
+
+        for encoding in ('utf-8', 'latin-1'):
+            buffer = io.BytesIO(content)
+            buffer.seek(start)
+            stream = io.TextIOWrapper(buffer, encoding=encoding, newline='')
+            try:
+                reader = csv.DictReader(stream, delimiter=delimiter)
+                return list(islice(reader, self.MAX_ROWS))
+            except UnicodeDecodeError:
+                continue
+        return []
+
     def _analyze_json(self, content: bytes, filename: str) -> FileAnalysisResult:
         """Analyze a JSON file."""
-        data = json.loads(content.decode('utf-8'))
+        text = content.decode('utf-8')
+
+        # Top-level arrays only need their first MAX_ROWS records decoded
+        if text.lstrip(' \t\n\r').startswith('['):
+            data = _decode_json_array_head(text, self.MAX_ROWS)
+        else:
+            data = json.loads(text)
 
         # Handle different JSON structures
         if isinstance(data, list):
@@ -204,38 +265,56 @@ class FileAnalyzer:
             return []
 
         columns = []
-        all_keys = set()
-        for row in rows:
-            all_keys.update(row.keys())
+        # Ordered de-duplication keeps columns in the order they appear in the file
+        all_keys = dict.fromkeys(chain.from_iterable(rows))
 
         for key in all_keys:
-            values = [row.get(key) for row in rows]
-            non_null_values = [v for v in values if v is not None and v != '']
-
-            # Determine type
-            dtype = self._infer_dtype(non_null_values)
-
-            # Calculate stats
-            unique_count = len(set(str(v) for v in non_null_values))
-            null_count = len(values) - len(non_null_values)
+            # Single pass per column: nulls, uniques, dtype probe and numeric stats
+            probe = []
+            seen = set()
+            null_count = 0
+            numeric_ok = True
+            total = 0.0
+            min_value = max_value = None
+
+            for row in rows:
+                v = row.get(key)
+                if v is None or v == '':
+                    null_count += 1
+                    continue
+
+                seen.add(str(v))
+                if len(probe) < 20:
+                    probe.append(v)
+
+                if numeric_ok:
+                    try:
+                        f = float(v)
+                    except (ValueError, TypeError):
+                        numeric_ok = False
+                        continue
+                    total += f
+                    if min_value is None or f < min_value:
+                        min_value = f
+                    if max_value is None or f > max_value:
+                        max_value = f
+
+            dtype = self._infer_dtype(probe)
 
             col = ColumnAnalysis(
                 name=key,
                 dtype=dtype,
-                sample_values=non_null_values[:5],
-                unique_count=unique_count,
+                sample_values=probe[:5],
+                unique_count=len(seen),
                 null_count=null_count
             )
 
             # Add numeric stats
-            if dtype == 'numeric' and non_null_values:
-                try:
-                    numeric_vals = [float(v) for v in non_null_values]
-                    col.min_value = min(numeric_vals)
-                    col.max_value = max(numeric_vals)
-                    col.mean_value = sum(numeric_vals) / len(numeric_vals)
-                except (ValueError, TypeError):
-                    pass
+            non_null_count = len(rows) - null_count
+            if dtype == DTYPE_NUMERIC and numeric_ok and non_null_count:
+                col.min_value = min_value
+                col.max_value = max_value
+                col.mean_value = total / non_null_count
 
             columns.append(col)
 
@@ -244,26 +323,29 @@ class FileAnalyzer:
     def _infer_dtype(self, values: List[Any]) -> str:
         """Infer data type from values."""
         if not values:
-            return 'text'
+            return DTYPE_TEXT
 
-        # Check for numeric
+        # Check for numeric, stopping as soon as the 80% threshold is decided
+        sample = values[:20]  # Sample first 20
+        threshold = len(sample) * 0.8
         numeric_count = 0
-        for v in values[:20]:  # Sample first 20
+        for i, v in enumerate(sample):
             try:
-                float(str(v).replace(',', '').replace('$', '').replace('%', ''))
+                float(str(v).translate(_NUMERIC_STRIP))
                 numeric_count += 1
             except (ValueError, TypeError):
                 pass
 
-        if numeric_count > len(values[:20]) * 0.8:
-            return 'numeric'
+            if numeric_count > threshold:
+                return DTYPE_NUMERIC
+            if numeric_count + len(sample) - i - 1 <= threshold:
+                break
 
         # Check for boolean
-        bool_values = {'true', 'false', 'yes', 'no', '1', '0'}
-        if all(str(v).lower() in bool_values for v in values[:20]):
-            return 'boolean'
+        if all(str(v).lower() in _BOOL_VALUES for v in sample):
+            return DTYPE_BOOLEAN
 
-        return 'text'
+        return DTYPE_TEXT
 
     def _detect_marketing_metrics(
         self,
@@ -274,26 +356,35 @@ class FileAnalyzer:
         detected = {}
 
         for col in columns:
-            col_lower = col.name.lower()
-
-            for metric_type, patterns in self.MARKETING_METRIC_PATTERNS.items():
-                if any(p in col_lower for p in patterns):
-                    if col.dtype == 'numeric' and col.mean_value is not None:
-                        detected[metric_type] = {
-                            'column': col.name,
-                            'mean': round(col.mean_value, 2),
-                            'min': col.min_value,
-                            'max': col.max_value
-                        }
-                    else:
-                        detected[metric_type] = {
-                            'column': col.name,
-                            'unique_values': col.unique_count
-                        }
-                    break
+            metric_type = self._match_metric_type(col.name)
+            if metric_type is None:
+                continue
+
+            if col.dtype == DTYPE_NUMERIC and col.mean_value is not None:
+                detected[metric_type] = {
+                    'column': col.name,
+                    'mean': round(col.mean_value, 2),
+                    'min': col.min_value,
+                    'max': col.max_value
+                }
+            else:
+                detected[metric_type] = {
+                    'column': col.name,
+                    'unique_values': col.unique_count
+                }
 
         return detected
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _match_metric_type(col_name: str) -> Optional[str]:
+        """Map a column name to the first matching metric type; cached per header name."""
+        col_lower = col_name.lower()
+        for metric_type, matcher in FileAnalyzer._METRIC_MATCHERS:
+            if matcher.search(col_lower):
+                return metric_type
+        return None
+
     def _generate_insights(
         self,
         columns: List[ColumnAnalysis],
@@ -312,19 +403,20 @@ class FileAnalyzer:
             insights.append(f"Detected marketing metrics: {', '.join(metric_names)}")
 
         # Numeric column insights
-        numeric_cols = [c for c in columns if c.dtype == 'numeric' and c.mean_value]
+        numeric_cols = [c for c in columns if c.dtype == DTYPE_NUMERIC and c.mean_value]
         for col in numeric_cols[:3]:
             if col.mean_value is not None:
                 insights.append(
                     f"{col.name}: avg={col.mean_value:.2f}, range={col.min_value:.2f}-{col.max_value:.2f}"
                 )
 
-        # High cardinality warning
-        high_cardinality = [c for c in columns if c.unique_count > len(rows) * 0.9 and c.dtype == 'text']
+        # High cardinality warning (only the first three are reported)
+        cardinality_limit = len(rows) * 0.9
+        high_cardinality = list(islice(
+            (c.name for c in columns if c.dtype == DTYPE_TEXT and c.unique_count > cardinality_limit), 3
+        ))
         if high_cardinality:
-            insights.append(
-                f"High cardinality columns (likely IDs): {', '.join(c.name for c in high_cardinality[:3])}"
-            )
+            insights.append(f"High cardinality columns (likely IDs): {', '.join(high_cardinality)}")
 
         return insights[:10]
 
@@ -1,7 +1,25 @@
 """Context-Aware Suggestion Engine for Marketing Intelligence"""
-from dataclasses import dataclass
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple
 from enum import Enum
+import re
+import string
+import threading
+
+
+_MISSING = object()
+_FORMATTER = string.Formatter()
+
+
+def _template_fields(template: str) -> Tuple[str, ...]:
+    """Names of the replacement fields referenced by a str.format template."""
+    return tuple(name for _, name, _, _ in _FORMATTER.parse(template) if name)
+
+
+def _compile_keywords(keywords: List[str]) -> re.Pattern:
+    """Compile a keyword list into one alternation matching any of them as a substring."""
+    return re.compile('|'.join(re.escape(kw) for kw in keywords))
 
 
 class SuggestionCategory(Enum):
@@ -11,7 +29,7 @@ class SuggestionCategory(Enum):
     GENERAL = "general"  # Standard prompts
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SuggestedPrompt:
     prompt_text: str
     relevance_score: float  # 0-100
@@ -76,25 +94,26 @@ class MarketingSuggestionEngine:
         ],
     }
 
-    # Context-triggered prompts (signal -> prompt)
+    # Context-triggered prompts (signal -> prompt). Conditions receive the
+    # metrics, benchmark, channels and campaigns sections pre-extracted once.
     CONTEXT_TRIGGERS = {
         # ROI/Performance triggers
         'low_roas': {
-            'condition': lambda ctx: ctx.get('metrics', {}).get('roas', 999) < 150,
+            'condition': lambda m, b, channels, campaigns: m.get('roas', 999) < 150,
             'prompt': "Your ROAS is {roas}%, below the 150% threshold. What's driving the low return?",
             'category': SuggestionCategory.URGENT,
             'relevance': 95,
             'tags': ['roi', 'roas', 'urgent']
         },
         'high_cac': {
-            'condition': lambda ctx: ctx.get('metrics', {}).get('cac', 0) > ctx.get('metrics', {}).get('clv', 999) * 0.3,
+            'condition': lambda m, b, channels, campaigns: m.get('cac', 0) > m.get('clv', 999) * 0.3,
             'prompt': "Your CAC (${cac}) is high relative to CLV. Should we discuss acquisition efficiency?",
             'category': SuggestionCategory.URGENT,
             'relevance': 90,
             'tags': ['cac', 'clv', 'efficiency']
         },
         'negative_roi': {
-            'condition': lambda ctx: ctx.get('metrics', {}).get('marketing_roi', 100) < 0,
+            'condition': lambda m, b, channels, campaigns: m.get('marketing_roi', 100) < 0,
             'prompt': "Marketing ROI is negative ({marketing_roi}%). Let's identify the problem areas.",
             'category': SuggestionCategory.URGENT,
             'relevance': 98,
@@ -103,14 +122,14 @@ class MarketingSuggestionEngine:
 
         # Channel performance triggers
         'underperforming_channel': {
-            'condition': lambda ctx: any(ch.get('efficiency_score', 100) < 50 for ch in ctx.get('channels', [])),
+            'condition': lambda m, b, channels, campaigns: any(ch.get('efficiency_score', 100) < 50 for ch in channels),
             'prompt': "Some channels are underperforming. Should we review channel efficiency?",
             'category': SuggestionCategory.OPPORTUNITY,
             'relevance': 85,
             'tags': ['channels', 'efficiency', 'optimization']
         },
         'high_performing_channel': {
-            'condition': lambda ctx: any(ch.get('roas', 0) > 400 for ch in ctx.get('channels', [])),
+            'condition': lambda m, b, channels, campaigns: any(ch.get('roas', 0) > 400 for ch in channels),
             'prompt': "You have high-performing channels (ROAS > 400%). Ready to scale them?",
             'category': SuggestionCategory.OPPORTUNITY,
             'relevance': 80,
@@ -119,7 +138,7 @@ class MarketingSuggestionEngine:
 
         # Campaign triggers
         'campaigns_below_benchmark': {
-            'condition': lambda ctx: len([c for c in ctx.get('campaigns', []) if c.get('overall_score', 100) < 60]) >= 2,
+            'condition': lambda m, b, channels, campaigns: len([c for c in campaigns if c.get('overall_score', 100) < 60]) >= 2,
             'prompt': "Multiple campaigns are below benchmark. Let's analyze what's not working.",
             'category': SuggestionCategory.URGENT,
             'relevance': 88,
@@ -128,7 +147,7 @@ class MarketingSuggestionEngine:
 
         # Benchmark triggers
         'below_industry_average': {
-            'condition': lambda ctx: ctx.get('benchmark', {}).get('overall_score', 100) < 70,
+            'condition': lambda m, b, channels, campaigns: b.get('overall_score', 100) < 70,
             'prompt': "Your benchmark score ({overall_score}) is below industry average. Where should we focus?",
             'category': SuggestionCategory.OPPORTUNITY,
             'relevance': 82,
@@ -137,7 +156,7 @@ class MarketingSuggestionEngine:
 
         # Content triggers
         'low_engagement': {
-            'condition': lambda ctx: ctx.get('metrics', {}).get('social_engagement_rate', 100) < 1,
+            'condition': lambda m, b, channels, campaigns: m.get('social_engagement_rate', 100) < 1,
             'prompt': "Social engagement is low ({social_engagement_rate}%). How can we boost it?",
             'category': SuggestionCategory.OPPORTUNITY,
             'relevance': 75,
@@ -146,14 +165,14 @@ class MarketingSuggestionEngine:
 
         # Conversion triggers
         'high_churn': {
-            'condition': lambda ctx: ctx.get('metrics', {}).get('churn_rate', 0) > 10,
+            'condition': lambda m, b, channels, campaigns: m.get('churn_rate', 0) > 10,
             'prompt': "Churn rate is {churn_rate}%, above healthy levels. Let's discuss retention strategies.",
             'category': SuggestionCategory.URGENT,
             'relevance': 92,
             'tags': ['retention', 'churn', 'customers']
         },
         'low_conversion': {
-            'condition': lambda ctx: ctx.get('metrics', {}).get('conversion_rate', 100) < 2,
+            'condition': lambda m, b, channels, campaigns: m.get('conversion_rate', 100) < 2,
             'prompt': "Conversion rate is only {conversion_rate}%. What's blocking conversions?",
             'category': SuggestionCategory.OPPORTUNITY,
             'relevance': 85,
@@ -161,8 +180,87 @@ class MarketingSuggestionEngine:
         },
     }
 
+    BASE_RELEVANCE = 50  # Highest relevance a base prompt can get
+    FOLLOW_UP_RELEVANCE = 70
+    _TRIGGERS_OUTRANK_FALLBACKS = (
+        min(trigger['relevance'] for trigger in CONTEXT_TRIGGERS.values())
+        > max(BASE_RELEVANCE, FOLLOW_UP_RELEVANCE)
+    )
+
+    # BASE_PROMPTS as ready-made SuggestedPrompts; only relevance varies per call
+    _BASE_PROMPT_TEMPLATES = {
+        mode: tuple(
+            SuggestedPrompt(
+                prompt_text=prompt_text,
+                relevance_score=0,
+                category=SuggestionCategory.GENERAL,
+                rationale=f"Common question for {mode.replace('_', ' ')}",
+                topic_tags=tags
+            )
+            for prompt_text, tags in prompts
+        )
+        for mode, prompts in BASE_PROMPTS.items()
+    }
+
+    # Flattened (name, trigger, rationale, template fields) rows, resolved once at class load
+    _TRIGGER_TABLE = tuple(
+        (name, trigger, f"Based on your current {name.replace('_', ' ')} metrics", _template_fields(trigger['prompt']))
+        for name, trigger in CONTEXT_TRIGGERS.items()
+    )
+
+    # Follow-up prompts keyed off keywords in the last assistant response
+    FOLLOW_UP_TRIGGERS = [
+        {
+            'keywords': ['recommend', 'suggest', 'should consider'],
+            'prompt': "Can you elaborate on those recommendations?",
+            'tags': ['follow-up', 'recommendations']
+        },
+        {
+            'keywords': ['campaign', 'campaigns'],
+            'prompt': "Which specific campaign should we focus on first?",
+            'tags': ['follow-up', 'campaigns']
+        },
+        {
+            'keywords': ['budget', 'spend', 'investment'],
+            'prompt': "How should we reallocate budget based on this?",
+            'tags': ['follow-up', 'budget']
+        },
+        {
+            'keywords': ['roi', 'return', 'roas'],
+            'prompt': "What's the fastest way to improve our ROI?",
+            'tags': ['follow-up', 'roi']
+        },
+    ]
+    _FOLLOW_UP_MATCHERS = tuple(
+        (_compile_keywords(trigger['keywords']), trigger) for trigger in FOLLOW_UP_TRIGGERS
+    )
+
+    # Keywords that tag a message with a topic
+    TOPIC_KEYWORDS = {
+        'roi': ['roi', 'return', 'roas', 'profitability'],
+        'campaigns': ['campaign', 'campaigns', 'ads', 'advertising'],
+        'channels': ['channel', 'channels', 'paid', 'organic', 'social'],
+        'content': ['content', 'blog', 'video', 'article'],
+        'conversion': ['conversion', 'convert', 'funnel', 'leads'],
+        'budget': ['budget', 'spend', 'investment', 'cost'],
+        'benchmarks': ['benchmark', 'compare', 'industry', 'competitors'],
+        'retention': ['retention', 'churn', 'loyalty', 'customer lifetime'],
+        'engagement': ['engagement', 'engagement rate', 'interaction'],
+    }
+    _TOPIC_MATCHERS = tuple(
+        (topic, _compile_keywords(keywords)) for topic, keywords in TOPIC_KEYWORDS.items()
+    )
+
+    # Context fields read by trigger conditions and prompt templates
+    _FINGERPRINT_FIELDS = (
+        'roas', 'cac', 'clv', 'marketing_roi', 'overall_score',
+        'social_engagement_rate', 'churn_rate', 'conversion_rate',
+    )
+    SUGGESTION_CACHE_SIZE = 256
+
     def __init__(self):
-        pass
+        self._suggestion_cache: 'OrderedDict[tuple, Tuple[SuggestedPrompt, ...]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def get_suggestions(
         self,
@@ -187,82 +285,179 @@ class MarketingSuggestionEngine:
         Returns:
             List of SuggestedPrompt objects sorted by relevance
         """
-        discussed_topics = discussed_topics or []
-        dismissed_prompts = dismissed_prompts or []
-
+        # Membership tests below run once per trigger/prompt; hash them once here
+        discussed = frozenset(discussed_topics or ())
+        dismissed = frozenset(dismissed_prompts or ())
+
+        key = self._fingerprint(mode, context, conversation_history, discussed, dismissed, max_suggestions)
+        if key is not None:
+            with self._cache_lock:
+                cached = self._suggestion_cache.get(key)
+                if cached is not None:
+                    self._suggestion_cache.move_to_end(key)
+                    return list(cached)
+
+        suggestions = self._build_suggestions(
+            mode, context, conversation_history, discussed, dismissed, max_suggestions
+        )
+
+        if key is not None:
+            with self._cache_lock:
+                self._suggestion_cache[key] = tuple(suggestions)
+                if len(self._suggestion_cache) > self.SUGGESTION_CACHE_SIZE:
+                    self._suggestion_cache.popitem(last=False)
+
+        return suggestions
+
+    def _fingerprint(
+        self,
+        mode: str,
+        context: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        discussed: FrozenSet[str],
+        dismissed: FrozenSet[str],
+        max_suggestions: int
+    ) -> Optional[tuple]:
+        """Build a hashable key over every input the suggestions depend on.
+
+        Returns None when the inputs can't be keyed (unexpected shapes or
+        unhashable values), in which case suggestions are computed uncached.
+        """
+        try:
+            metrics = context.get('metrics', {})
+            benchmark = context.get('benchmark', {})
+            key = (
+                mode,
+                max_suggestions,
+                # repr() keeps values that compare equal but format differently (1 vs 1.0) apart
+                tuple(repr(metrics.get(f, _MISSING)) for f in self._FINGERPRINT_FIELDS),
+                tuple(repr(benchmark.get(f, _MISSING)) for f in self._FINGERPRINT_FIELDS),
+                tuple(
+                    (ch.get('efficiency_score', _MISSING), ch.get('roas', _MISSING))
+                    for ch in context.get('channels', [])
+                ),
+                tuple(c.get('overall_score', _MISSING) for c in context.get('campaigns', [])),
+                self._last_assistant_response(conversation_history) if conversation_history else None,
+                discussed,
+                dismissed,
+            )
+            hash(key)
+        except (AttributeError, TypeError):
+            return None
+        return key
+
+    def _build_suggestions(
+        self,
+        mode: str,
+        context: Dict[str, Any],
+        conversation_history: List[Dict[str, Any]],
+        discussed: FrozenSet[str],
+        dismissed: FrozenSet[str],
+        max_suggestions: int
+    ) -> List[SuggestedPrompt]:
+        """Compute suggestions without consulting the cache."""
         suggestions = []
 
+        # Read each context section once for all trigger conditions
+        metrics = context.get('metrics', {})
+        benchmark = context.get('benchmark', {})
+        channels = context.get('channels', [])
+        campaigns = context.get('campaigns', [])
+
         # 1. Check context-triggered prompts first (highest priority)
-        for trigger_name, trigger in self.CONTEXT_TRIGGERS.items():
+        for trigger_name, trigger, rationale, fields in self._TRIGGER_TABLE:
             try:
-                if trigger['condition'](context):
-                    prompt_text = self._format_prompt(trigger['prompt'], context)
+                if trigger['condition'](metrics, benchmark, channels, campaigns):
+                    prompt_text = self._format_prompt(trigger['prompt'], fields, metrics, benchmark)
 
                     # Skip if already discussed or dismissed
-                    if self._is_topic_discussed(trigger['tags'], discussed_topics):
+                    if self._is_topic_discussed(trigger['tags'], discussed):
                         continue
-                    if prompt_text in dismissed_prompts:
+                    if prompt_text in dismissed:
                         continue
 
                     suggestions.append(SuggestedPrompt(
                         prompt_text=prompt_text,
                         relevance_score=trigger['relevance'],
                         category=trigger['category'],
-                        rationale=f"Based on your current {trigger_name.replace('_', ' ')} metrics",
+                        rationale=rationale,
                         topic_tags=trigger['tags']
                     ))
             except Exception:
                 continue  # Skip malformed triggers
 
+        # Every trigger outranks base prompts and follow-ups, so once the triggers
+        # alone fill all slots the remaining phases cannot change the result
+        if self._TRIGGERS_OUTRANK_FALLBACKS and 0 <= max_suggestions <= len(suggestions):
+            suggestions.sort(key=lambda x: x.relevance_score, reverse=True)
+            return suggestions[:max_suggestions]
+
         # 2. Add base prompts for the mode (fill remaining slots)
-        base_prompts = self.BASE_PROMPTS.get(mode, self.BASE_PROMPTS['general'])
-        for prompt_text, tags in base_prompts:
-            if self._is_topic_discussed(tags, discussed_topics):
+        templates = self._BASE_PROMPT_TEMPLATES.get(mode)
+        overrides = {}
+        if templates is None:
+            # Unknown modes reuse the general prompts but keep their own rationale
+            templates = self._BASE_PROMPT_TEMPLATES['general']
+            overrides['rationale'] = f"Common question for {mode.replace('_', ' ')}"
+
+        for template in templates:
+            if self._is_topic_discussed(template.topic_tags, discussed):
                 continue
-            if prompt_text in dismissed_prompts:
+            if template.prompt_text in dismissed:
                 continue
 
             # Lower relevance for base prompts
-            relevance = 50 - (len(suggestions) * 5)  # Decreasing relevance
+            relevance = self.BASE_RELEVANCE - (len(suggestions) * 5)  # Decreasing relevance
 
-            suggestions.append(SuggestedPrompt(
-                prompt_text=prompt_text,
-                relevance_score=max(relevance, 20),
-                category=SuggestionCategory.GENERAL,
-                rationale=f"Common question for {mode.replace('_', ' ')}",
-                topic_tags=tags
-            ))
+            suggestions.append(replace(template, relevance_score=max(relevance, 20), **overrides))
 
         # 3. Add follow-up suggestions based on conversation history
         if conversation_history:
-            follow_ups = self._generate_follow_ups(conversation_history, discussed_topics)
+            follow_ups = self._generate_follow_ups(conversation_history, discussed)
             suggestions.extend(follow_ups)
 
         # Sort by relevance and return top N
         suggestions.sort(key=lambda x: x.relevance_score, reverse=True)
         return suggestions[:max_suggestions]
 
-    def _format_prompt(self, template: str, context: Dict[str, Any]) -> str:
-        """Format prompt template with context values."""
-        metrics = context.get('metrics', {})
-        benchmark = context.get('benchmark', {})
-
-        # Flatten context for formatting
-        format_dict = {**metrics, **benchmark}
-
-        try:
-            return template.format(**format_dict)
-        except KeyError:
-            return template  # Return unformatted if values missing
-
-    def _is_topic_discussed(self, tags: List[str], discussed: List[str]) -> bool:
+    def _format_prompt(
+        self,
+        template: str,
+        fields: Tuple[str, ...],
+        metrics: Dict[str, Any],
+        benchmark: Dict[str, Any]
+    ) -> str:
+        """Format prompt template with the context values it references."""
+        if not fields:
+            return template
+
+        # Benchmark values take precedence over metrics of the same name
+        values = {}
+        for name in fields:
+            if name in benchmark:
+                values[name] = benchmark[name]
+            elif name in metrics:
+                values[name] = metrics[name]
+            else:
+                return template  # Return unformatted if values missing
+
+        return template.format_map(values)
+
+    def _is_topic_discussed(self, tags: List[str], discussed: FrozenSet[str]) -> bool:
         """Check if topic tags overlap with discussed topics."""
-        return any(tag in discussed for tag in tags)
+        return not discussed.isdisjoint(tags)
+
+    def _last_assistant_response(self, history: List[Dict[str, Any]]) -> Optional[str]:
+        """Lowercased content of the latest assistant message among the last four."""
+        last_messages = [m for m in history[-4:] if m.get('role') == 'assistant']
+        if not last_messages:
+            return None
+        return last_messages[-1].get('content', '').lower()
 
     def _generate_follow_ups(
         self,
         history: List[Dict[str, Any]],
-        discussed: List[str]
+        discussed: FrozenSet[str]
     ) -> List[SuggestedPrompt]:
         """Generate follow-up suggestions based on conversation history."""
         follow_ups = []
@@ -270,43 +465,17 @@ class MarketingSuggestionEngine:
         if not history:
             return follow_ups
 
-        # Get last assistant message
-        last_messages = [m for m in history[-4:] if m.get('role') == 'assistant']
-        if not last_messages:
+        last_response = self._last_assistant_response(history)
+        if last_response is None:
             return follow_ups
 
-        last_response = last_messages[-1].get('content', '').lower()
-
         # Check for actionable topics mentioned
-        follow_up_triggers = [
-            {
-                'keywords': ['recommend', 'suggest', 'should consider'],
-                'prompt': "Can you elaborate on those recommendations?",
-                'tags': ['follow-up', 'recommendations']
-            },
-            {
-                'keywords': ['campaign', 'campaigns'],
-                'prompt': "Which specific campaign should we focus on first?",
-                'tags': ['follow-up', 'campaigns']
-            },
-            {
-                'keywords': ['budget', 'spend', 'investment'],
-                'prompt': "How should we reallocate budget based on this?",
-                'tags': ['follow-up', 'budget']
-            },
-            {
-                'keywords': ['roi', 'return', 'roas'],
-                'prompt': "What's the fastest way to improve our ROI?",
-                'tags': ['follow-up', 'roi']
-            },
-        ]
-
-        for trigger in follow_up_triggers:
-            if any(kw in last_response for kw in trigger['keywords']):
+        for matcher, trigger in self._FOLLOW_UP_MATCHERS:
+            if matcher.search(last_response):
                 if not self._is_topic_discussed(trigger['tags'], discussed):
                     follow_ups.append(SuggestedPrompt(
                         prompt_text=trigger['prompt'],
-                        relevance_score=70,
+                        relevance_score=self.FOLLOW_UP_RELEVANCE,
                         category=SuggestionCategory.FOLLOW_UP,
                         rationale="Follow up on our previous discussion",
                         topic_tags=trigger['tags']
@@ -318,21 +487,9 @@ class MarketingSuggestionEngine:
         """Extract topic tags from a message."""
         topics = []
 
-        topic_keywords = {
-            'roi': ['roi', 'return', 'roas', 'profitability'],
-            'campaigns': ['campaign', 'campaigns', 'ads', 'advertising'],
-            'channels': ['channel', 'channels', 'paid', 'organic', 'social'],
-            'content': ['content', 'blog', 'video', 'article'],
-            'conversion': ['conversion', 'convert', 'funnel', 'leads'],
-            'budget': ['budget', 'spend', 'investment', 'cost'],
-            'benchmarks': ['benchmark', 'compare', 'industry', 'competitors'],
-            'retention': ['retention', 'churn', 'loyalty', 'customer lifetime'],
-            'engagement': ['engagement', 'engagement rate', 'interaction'],
-        }
-
         message_lower = message.lower()
-        for topic, keywords in topic_keywords.items():
-            if any(kw in message_lower for kw in keywords):
+        for topic, matcher in self._TOPIC_MATCHERS:
+            if matcher.search(message_lower):
                 topics.append(topic)
 
         return topics
@@ -19,7 +19,11 @@ class AlertCategory(Enum):
     CHANNEL = "channel"
 
 
-@dataclass
+# Sort rank per severity (critical first)
+SEVERITY_ORDER = {AlertSeverity.CRITICAL: 0, AlertSeverity.WARNING: 1, AlertSeverity.INFO: 2}
+
+
+@dataclass(slots=True, frozen=True)
 class Alert:
     """Represents a marketing alert."""
     id: str
@@ -69,24 +73,34 @@ class AlertEngine:
             self.thresholds.update(custom_thresholds)
         self._alert_counter = 0
 
-    def _generate_id(self) -> str:
+    def _generate_id(self, prefix: str) -> str:
         self._alert_counter += 1
-        return f"mkt-alert-{datetime.now().strftime('%Y%m%d%H%M%S')}-{self._alert_counter}"
+        return f"{prefix}{self._alert_counter}"
 
     def check_metrics(self, data: Dict[str, Any]) -> List[Alert]:
         """Check all metrics and generate alerts."""
         alerts = []
 
+        # One clock read per batch: alerts from the same check share a timestamp
+        now = datetime.now()
+        id_prefix = f"mkt-alert-{now.strftime('%Y%m%d%H%M%S')}-"
+
         metrics = data.get('metrics', {})
         channels = data.get('channels', [])
         campaigns = data.get('campaigns', [])
 
+        # Resolve thresholds once rather than per channel/campaign row
+        roi_critical = self.thresholds['roi_critical']
+        roi_warning = self.thresholds['roi_warning']
+        utilization_high = self.thresholds['spend_utilization_high']
+        utilization_low = self.thresholds['spend_utilization_low']
+
         # Check ROAS
         roas = metrics.get('roas', 0)
         if roas > 0:
             if roas < self.thresholds['roas_critical']:
                 alerts.append(Alert(
-                    id=self._generate_id(),
+                    id=self._generate_id(id_prefix),
                     severity=AlertSeverity.CRITICAL,
                     category=AlertCategory.ROI,
                     title="Critical: ROAS Below Break-Even",
@@ -95,11 +109,11 @@ class AlertEngine:
                     current_value=roas,
                     threshold_value=self.thresholds['roas_critical'],
                     recommendation="Immediately pause underperforming campaigns and reallocate budget to high-performing channels.",
-                    created_at=datetime.now()
+                    created_at=now
                 ))
             elif roas < self.thresholds['roas_warning']:
                 alerts.append(Alert(
-                    id=self._generate_id(),
+                    id=self._generate_id(id_prefix),
                     severity=AlertSeverity.WARNING,
                     category=AlertCategory.ROI,
                     title="Warning: ROAS Needs Improvement",
@@ -108,7 +122,7 @@ class AlertEngine:
                     current_value=roas,
                     threshold_value=self.thresholds['roas_warning'],
                     recommendation="Review campaign targeting and creative assets. Consider A/B testing to improve conversion rates.",
-                    created_at=datetime.now()
+                    created_at=now
                 ))
 
         # Check individual channel performance
@@ -116,9 +130,9 @@ class AlertEngine:
             channel_roi = channel.get('roi', 0)
             channel_name = channel.get('name', 'Unknown')
 
-            if channel_roi < self.thresholds['roi_critical']:
+            if channel_roi < roi_critical:
                 alerts.append(Alert(
-                    id=self._generate_id(),
+                    id=self._generate_id(id_prefix),
                     severity=AlertSeverity.CRITICAL,
                     category=AlertCategory.CHANNEL,
                     title=f"Critical: {channel_name} Has Negative ROI",
@@ -127,20 +141,20 @@ class AlertEngine:
                     current_value=channel_roi,
                     threshold_value=0,
                     recommendation=f"Pause {channel_name} campaigns immediately and investigate targeting, creative, and landing pages.",
-                    created_at=datetime.now()
+                    created_at=now
                 ))
-            elif channel_roi < self.thresholds['roi_warning']:
+            elif channel_roi < roi_warning:
                 alerts.append(Alert(
-                    id=self._generate_id(),
+                    id=self._generate_id(id_prefix),
                     severity=AlertSeverity.WARNING,
                     category=AlertCategory.CHANNEL,
                     title=f"Warning: {channel_name} Underperforming",
-                    message=f"{channel_name} ROI is {channel_roi:.1f}%, below the {self.thresholds['roi_warning']}% target.",
+                    message=f"{channel_name} ROI is {channel_roi:.1f}%, below the {roi_warning}% target.",
                     metric_name=f"{channel_name} ROI",
                     current_value=channel_roi,
-                    threshold_value=self.thresholds['roi_warning'],
+                    threshold_value=roi_warning,
                     recommendation=f"Optimize {channel_name} targeting and bid strategies. Consider reducing budget if performance doesn't improve.",
-                    created_at=datetime.now()
+                    created_at=now
                 ))
 
         # Check campaign budget utilization
@@ -153,36 +167,35 @@ class AlertEngine:
             if budget > 0 and status == 'active':
                 utilization = (spent / budget) * 100
 
-                if utilization > self.thresholds['spend_utilization_high']:
+                if utilization > utilization_high:
                     alerts.append(Alert(
-                        id=self._generate_id(),
+                        id=self._generate_id(id_prefix),
                         severity=AlertSeverity.WARNING,
                         category=AlertCategory.SPEND,
                         title=f"Budget Nearly Exhausted: {name}",
                         message=f"Campaign '{name}' has used {utilization:.1f}% of its budget.",
                         metric_name="Budget Utilization",
                         current_value=utilization,
-                        threshold_value=self.thresholds['spend_utilization_high'],
+                        threshold_value=utilization_high,
                         recommendation="Review campaign performance. If performing well, consider increasing budget to capture more conversions.",
-                        created_at=datetime.now()
+                        created_at=now
                     ))
-                elif utilization < self.thresholds['spend_utilization_low']:
+                elif utilization < utilization_low:
                     alerts.append(Alert(
-                        id=self._generate_id(),
+                        id=self._generate_id(id_prefix),
                         severity=AlertSeverity.INFO,
                         category=AlertCategory.SPEND,
                         title=f"Low Budget Utilization: {name}",
                         message=f"Campaign '{name}' has only used {utilization:.1f}% of its budget.",
                         metric_name="Budget Utilization",
                         current_value=utilization,
-                        threshold_value=self.thresholds['spend_utilization_low'],
+                        threshold_value=utilization_low,
                         recommendation="Check if targeting is too narrow or bids are too low. Consider broadening audience or increasing bids.",
-                        created_at=datetime.now()
+                        created_at=now
                     ))
 
         # Sort by severity (critical first)
-        severity_order = {AlertSeverity.CRITICAL: 0, AlertSeverity.WARNING: 1, AlertSeverity.INFO: 2}
-        alerts.sort(key=lambda a: severity_order[a.severity])
+        alerts.sort(key=lambda a: SEVERITY_ORDER[a.severity])
 
         return alerts
 
@@ -190,17 +203,18 @@ class AlertEngine:
         """Get a summary of alerts by severity."""
         summary = {
             'total': len(alerts),
-            'critical': sum(1 for a in alerts if a.severity == AlertSeverity.CRITICAL),
-            'warning': sum(1 for a in alerts if a.severity == AlertSeverity.WARNING),
-            'info': sum(1 for a in alerts if a.severity == AlertSeverity.INFO),
+            'critical': 0,
+            'warning': 0,
+            'info': 0,
             'categories': {}
         }
 
+        # Single pass: severity values double as the summary keys
+        categories = summary['categories']
         for alert in alerts:
+            summary[alert.severity.value] += 1
             cat = alert.category.value
-            if cat not in summary['categories']:
-                summary['categories'][cat] = 0
-            summary['categories'][cat] += 1
+            categories[cat] = categories.get(cat, 0) + 1
 
         return summary
 
@@ -0,0 +1,49 @@
+"""Marketing Intelligence - Query counting for catching N+1 regressions"""
+import logging
+from contextlib import contextmanager
+from typing import List
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Requests issuing more statements than this are logged in development
+DEFAULT_QUERY_BUDGET = 10
+
+
+@contextmanager
+def count_queries(conn):
+    """Collect the SQL statements executed on `conn` (an Engine or Connection) inside the block.
+
+    Usage:
+        with count_queries(db.session.connection()) as queries:
+            ChatRepository.get_sessions()
+        assert len(queries) <= 1
+    """
+    queries: List[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(conn, 'before_cursor_execute', _before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(conn, 'before_cursor_execute', _before_cursor_execute)
+
+
+def init_query_budget(app, engine, budget: int = DEFAULT_QUERY_BUDGET):
+    """Warn about any request that executes more than `budget` SQL statements."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _count_request_query(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            g._query_count = g.get('_query_count', 0) + 1
+
+    @app.after_request
+    def _check_query_budget(response):
+        count = g.get('_query_count', 0)
+        if count > budget:
+            logger.warning(f"{request.method} {request.path} executed {count} queries (budget {budget})")
+        return response
@@ -1,5 +1,7 @@
 """Marketing Intelligence - Database Models"""
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, select
+from sqlalchemy.orm import column_property, deferred
 from datetime import datetime
 import uuid
 
@@ -22,10 +24,10 @@ class Organization(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    campaigns = db.relationship('Campaign', backref='organization', lazy=True)
-    channels = db.relationship('Channel', backref='organization', lazy=True)
-    content = db.relationship('Content', backref='organization', lazy=True)
-    chat_sessions = db.relationship('ChatSession', backref='organization', lazy=True)
+    campaigns = db.relationship('Campaign', back_populates='organization')
+    channels = db.relationship('Channel', back_populates='organization')
+    content = db.relationship('Content', back_populates='organization')
+    chat_sessions = db.relationship('ChatSession', back_populates='organization')
 
     def to_dict(self):
         return {
@@ -40,6 +42,10 @@ class Organization(db.Model):
 
 class Campaign(db.Model):
     __tablename__ = 'campaigns'
+    __table_args__ = (
+        db.Index('ix_campaign_org_status', 'organization_id', 'status'),
+        db.Index('ix_campaign_org_created', 'organization_id', 'created_at'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
     organization_id = db.Column(db.String(36), db.ForeignKey('organizations.id'), nullable=False)
@@ -67,6 +73,8 @@ class Campaign(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    organization = db.relationship('Organization', back_populates='campaigns')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -120,6 +128,8 @@ class Channel(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    organization = db.relationship('Organization', back_populates='channels')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -143,6 +153,9 @@ class Channel(db.Model):
 
 class Content(db.Model):
     __tablename__ = 'content'
+    __table_args__ = (
+        db.Index('ix_content_org_funnel_stage', 'organization_id', 'funnel_stage'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
     organization_id = db.Column(db.String(36), db.ForeignKey('organizations.id'), nullable=False)
@@ -173,6 +186,8 @@ class Content(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    organization = db.relationship('Organization', back_populates='content')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -196,6 +211,9 @@ class Content(db.Model):
 
 class MarketingMetrics(db.Model):
     __tablename__ = 'marketing_metrics'
+    __table_args__ = (
+        db.Index('ix_marketing_metrics_org_period', 'organization_id', 'period', 'period_start'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
     organization_id = db.Column(db.String(36), db.ForeignKey('organizations.id'), nullable=False)
@@ -256,6 +274,9 @@ class MarketingMetrics(db.Model):
 
 class BenchmarkResult(db.Model):
     __tablename__ = 'benchmark_results'
+    __table_args__ = (
+        db.Index('ix_benchmark_result_org_type_created', 'organization_id', 'benchmark_type', 'created_at'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
     organization_id = db.Column(db.String(36), db.ForeignKey('organizations.id'), nullable=False)
@@ -302,11 +323,16 @@ class ChatSession(db.Model):
     conversation_summary = db.Column(db.Text)  # Running summary for long conversations
     summary_updated_at = db.Column(db.DateTime)
     topic_tags = db.Column(db.JSON, default=list)  # Extracted topic tags
-    key_insights = db.Column(db.JSON, default=list)  # Important insights from conversation
+    key_insights = deferred(db.Column(db.JSON, default=list))  # Important insights from conversation
+
+    organization = db.relationship('Organization', back_populates='chat_sessions')
 
-    messages = db.relationship('ChatMessage', backref='session', lazy=True,
+    # Collections must be loaded explicitly (selectinload) so listings never N+1
+    messages = db.relationship('ChatMessage', back_populates='session', lazy='raise',
+                               cascade='all, delete-orphan', passive_deletes=True,
                                order_by='ChatMessage.created_at')
-    uploaded_files = db.relationship('UploadedFile', backref='session', lazy=True)
+    uploaded_files = db.relationship('UploadedFile', back_populates='session', lazy='raise',
+                                     cascade='all, delete-orphan', passive_deletes=True)
 
     def to_dict(self):
         return {
@@ -318,21 +344,26 @@ class ChatSession(db.Model):
             'discussed_topics': self.discussed_topics or [],
             'topic_tags': self.topic_tags or [],
             'has_summary': self.conversation_summary is not None,
-            'file_count': len(self.uploaded_files) if self.uploaded_files else 0,
-            'message_count': len(self.messages) if self.messages else 0,
+            'file_count': self.file_count or 0,
+            'message_count': self.message_count or 0,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
 
 class ChatMessage(db.Model):
     __tablename__ = 'chat_messages'
+    __table_args__ = (
+        db.Index('ix_chat_message_session_created', 'session_id', 'created_at'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    session_id = db.Column(db.String(36), db.ForeignKey('chat_sessions.id'), nullable=False)
+    session_id = db.Column(db.String(36), db.ForeignKey('chat_sessions.id', ondelete='CASCADE'), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # user, assistant
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    session = db.relationship('ChatSession', back_populates='messages')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -348,7 +379,7 @@ class UploadedFile(db.Model):
     __tablename__ = 'uploaded_files'
 
     id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    session_id = db.Column(db.String(36), db.ForeignKey('chat_sessions.id'), nullable=False)
+    session_id = db.Column(db.String(36), db.ForeignKey('chat_sessions.id', ondelete='CASCADE'), nullable=False)
     organization_id = db.Column(db.String(36), db.ForeignKey('organizations.id'), nullable=True)
 
     filename = db.Column(db.String(255), nullable=False)
@@ -356,14 +387,17 @@ class UploadedFile(db.Model):
     file_size = db.Column(db.Integer)  # bytes
 
     # Store analysis results, not raw file (for security and size)
-    analysis_result = db.Column(db.JSON)  # Full analysis as JSON
-    context_summary = db.Column(db.Text)  # Formatted for prompt injection
+    # Deferred: file listings only need the metadata columns
+    analysis_result = deferred(db.Column(db.JSON))  # Full analysis as JSON
+    context_summary = deferred(db.Column(db.Text))  # Formatted for prompt injection
     row_count = db.Column(db.Integer)
     column_count = db.Column(db.Integer)
     detected_metrics = db.Column(db.JSON)  # Auto-detected metric columns
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    session = db.relationship('ChatSession', back_populates='uploaded_files')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -376,3 +410,32 @@ class UploadedFile(db.Model):
             'detected_metrics': self.detected_metrics,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+
+# Counts are correlated COUNT(*) subqueries so listings never load message bodies;
+# deferred so they are only computed where a query undefers them.
+ChatSession.message_count = column_property(
+    select(func.count(ChatMessage.id))
+    .where(ChatMessage.session_id == ChatSession.id)
+    .correlate_except(ChatMessage)
+    .scalar_subquery(),
+    deferred=True
+)
+ChatSession.file_count = column_property(
+    select(func.count(UploadedFile.id))
+    .where(UploadedFile.session_id == ChatSession.id)
+    .correlate_except(UploadedFile)
+    .scalar_subquery(),
+    deferred=True
+)
+
+
+def create_missing_indexes() -> None:
+    """Create declared indexes that existing tables lack.
+
+    db.create_all() skips tables that already exist, so indexes added to a
+    model later would otherwise only reach new databases.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
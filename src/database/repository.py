@@ -1,43 +1,93 @@
 """Marketing Intelligence - Repository Pattern for Data Access"""
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from .models import db, Organization, Campaign, Channel, Content, MarketingMetrics, BenchmarkResult, ChatSession, ChatMessage
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import undefer
+from sqlalchemy.orm.attributes import set_committed_value
+from .models import db, Organization, Campaign, Channel, Content, MarketingMetrics, BenchmarkResult, ChatSession, ChatMessage, UploadedFile
+
+
+def _finish(flush_only: bool = False) -> None:
+    """Commit the unit of work, or just flush it when the caller owns the transaction."""
+    if flush_only:
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def _insert_many(model, rows: List[Dict[str, Any]], flush_only: bool = False) -> int:
+    """Insert many rows with one executemany INSERT and a single commit."""
+    if not rows:
+        return 0
+    db.session.execute(insert(model), rows)
+    _finish(flush_only)
+    return len(rows)
+
+
+# Counters the stored channel KPIs are derived from
+CHANNEL_COUNTERS = ('impressions', 'clicks', 'conversions', 'spend', 'revenue')
+
+
+def _channel_kpis(impressions, clicks, conversions, spend, revenue) -> Dict[str, float]:
+    """Derived channel KPIs, in the units the demo data stores (percentages, ROAS x100)."""
+    impressions = impressions or 0
+    clicks = clicks or 0
+    conversions = conversions or 0
+    spend = spend or 0
+    revenue = revenue or 0
+    return {
+        'ctr': round(clicks / impressions * 100, 2) if impressions > 0 else 0,
+        'conversion_rate': round(conversions / clicks * 100, 2) if clicks > 0 else 0,
+        'cpc': round(spend / clicks, 2) if clicks > 0 else 0,
+        'cpa': round(spend / conversions, 2) if conversions > 0 else 0,
+        'roas': round(revenue / spend * 100, 1) if spend > 0 else 0,
+    }
+
+
+def _with_channel_kpis(row: Dict[str, Any], counters) -> Dict[str, Any]:
+    """Add the KPIs derived from `counters` to `row`; KPIs the caller passed explicitly are kept."""
+    return {**_channel_kpis(*counters), **row}
 
 
 class OrganizationRepository:
     """Repository for Organization operations."""
 
     @staticmethod
-    def create(name: str, **kwargs) -> Organization:
+    def create(name: str, flush_only: bool = False, **kwargs) -> Organization:
         org = Organization(name=name, **kwargs)
         db.session.add(org)
-        db.session.commit()
+        _finish(flush_only)
         return org
 
+    @staticmethod
+    def create_many(rows: List[Dict[str, Any]], flush_only: bool = False) -> int:
+        return _insert_many(Organization, rows, flush_only)
+
     @staticmethod
     def get_by_id(org_id: str) -> Optional[Organization]:
-        return Organization.query.get(org_id)
+        return db.session.get(Organization, org_id)
 
     @staticmethod
     def get_all() -> List[Organization]:
-        return Organization.query.order_by(Organization.name).all()
+        return db.session.scalars(select(Organization).order_by(Organization.name)).all()
 
     @staticmethod
-    def update(org_id: str, **kwargs) -> Optional[Organization]:
-        org = Organization.query.get(org_id)
+    def update(org_id: str, flush_only: bool = False, **kwargs) -> Optional[Organization]:
+        org = db.session.get(Organization, org_id)
         if org:
             for key, value in kwargs.items():
                 if hasattr(org, key):
                     setattr(org, key, value)
-            db.session.commit()
+            _finish(flush_only)
         return org
 
     @staticmethod
-    def delete(org_id: str) -> bool:
-        org = Organization.query.get(org_id)
+    def delete(org_id: str, flush_only: bool = False) -> bool:
+        org = db.session.get(Organization, org_id)
         if org:
             db.session.delete(org)
-            db.session.commit()
+            _finish(flush_only)
             return True
         return False
 
@@ -46,40 +96,62 @@ class CampaignRepository:
     """Repository for Campaign operations."""
 
     @staticmethod
-    def create(organization_id: str, name: str, **kwargs) -> Campaign:
+    def create(organization_id: str, name: str, flush_only: bool = False, **kwargs) -> Campaign:
         campaign = Campaign(organization_id=organization_id, name=name, **kwargs)
         db.session.add(campaign)
-        db.session.commit()
+        _finish(flush_only)
         return campaign
 
+    @staticmethod
+    def create_many(rows: List[Dict[str, Any]], flush_only: bool = False) -> int:
+        return _insert_many(Campaign, rows, flush_only)
+
     @staticmethod
     def get_by_id(campaign_id: str) -> Optional[Campaign]:
-        return Campaign.query.get(campaign_id)
+        return db.session.get(Campaign, campaign_id)
 
     @staticmethod
     def get_by_organization(org_id: str) -> List[Campaign]:
-        return Campaign.query.filter_by(organization_id=org_id).order_by(Campaign.created_at.desc()).all()
+        return db.session.scalars(
+            select(Campaign).where(Campaign.organization_id == org_id).order_by(Campaign.created_at.desc())
+        ).all()
+
+    @staticmethod
+    def get_performance_rows(org_id: str) -> List[Row]:
+        """Lightweight rows for analytics/report payloads (no ORM hydration)."""
+        return db.session.execute(
+            select(
+                Campaign.name,
+                Campaign.campaign_type.label('channel'),
+                Campaign.status,
+                Campaign.budget,
+                Campaign.spend.label('spent'),
+                Campaign.leads
+            ).where(Campaign.organization_id == org_id).order_by(Campaign.created_at.desc())
+        ).all()
 
     @staticmethod
     def get_active(org_id: str) -> List[Campaign]:
-        return Campaign.query.filter_by(organization_id=org_id, status='active').all()
+        return db.session.scalars(
+            select(Campaign).where(Campaign.organization_id == org_id, Campaign.status == 'active')
+        ).all()
 
     @staticmethod
-    def update(campaign_id: str, **kwargs) -> Optional[Campaign]:
-        campaign = Campaign.query.get(campaign_id)
+    def update(campaign_id: str, flush_only: bool = False, **kwargs) -> Optional[Campaign]:
+        campaign = db.session.get(Campaign, campaign_id)
         if campaign:
             for key, value in kwargs.items():
                 if hasattr(campaign, key):
                     setattr(campaign, key, value)
-            db.session.commit()
+            _finish(flush_only)
         return campaign
 
     @staticmethod
-    def delete(campaign_id: str) -> bool:
-        campaign = Campaign.query.get(campaign_id)
+    def delete(campaign_id: str, flush_only: bool = False) -> bool:
+        campaign = db.session.get(Campaign, campaign_id)
         if campaign:
             db.session.delete(campaign)
-            db.session.commit()
+            _finish(flush_only)
             return True
         return False
 
@@ -88,61 +160,122 @@ class ChannelRepository:
     """Repository for Channel operations."""
 
     @staticmethod
-    def create(organization_id: str, name: str, channel_type: str, **kwargs) -> Channel:
+    def create(organization_id: str, name: str, channel_type: str, flush_only: bool = False, **kwargs) -> Channel:
+        if not kwargs.keys().isdisjoint(CHANNEL_COUNTERS):
+            kwargs = _with_channel_kpis(kwargs, (kwargs.get(c) for c in CHANNEL_COUNTERS))
         channel = Channel(organization_id=organization_id, name=name, channel_type=channel_type, **kwargs)
         db.session.add(channel)
-        db.session.commit()
+        _finish(flush_only)
         return channel
 
+    @staticmethod
+    def create_many(rows: List[Dict[str, Any]], flush_only: bool = False) -> int:
+        """Bulk insert channels, deriving the stored KPIs for rows that carry counters."""
+        rows = [
+            _with_channel_kpis(row, (row.get(c) for c in CHANNEL_COUNTERS))
+            if not row.keys().isdisjoint(CHANNEL_COUNTERS) else row
+            for row in rows
+        ]
+        return _insert_many(Channel, rows, flush_only)
+
     @staticmethod
     def get_by_id(channel_id: str) -> Optional[Channel]:
-        return Channel.query.get(channel_id)
+        return db.session.get(Channel, channel_id)
 
     @staticmethod
     def get_by_organization(org_id: str) -> List[Channel]:
-        return Channel.query.filter_by(organization_id=org_id).all()
+        return db.session.scalars(select(Channel).where(Channel.organization_id == org_id)).all()
+
+    @staticmethod
+    def get_performance_rows(org_id: str) -> List[Row]:
+        """Lightweight rows for analytics/report payloads (no ORM hydration)."""
+        return db.session.execute(
+            select(Channel.name, Channel.spend, Channel.revenue, Channel.conversions)
+            .where(Channel.organization_id == org_id)
+        ).all()
 
     @staticmethod
-    def update(channel_id: str, **kwargs) -> Optional[Channel]:
-        channel = Channel.query.get(channel_id)
+    def update(channel_id: str, flush_only: bool = False, **kwargs) -> Optional[Channel]:
+        channel = db.session.get(Channel, channel_id)
         if channel:
             for key, value in kwargs.items():
                 if hasattr(channel, key):
                     setattr(channel, key, value)
-            db.session.commit()
+            if not kwargs.keys().isdisjoint(CHANNEL_COUNTERS):
+                for key, value in _channel_kpis(*(getattr(channel, c) for c in CHANNEL_COUNTERS)).items():
+                    if key not in kwargs:
+                        setattr(channel, key, value)
+            _finish(flush_only)
         return channel
 
+    @staticmethod
+    def update_many(rows: List[Dict[str, Any]], flush_only: bool = False) -> int:
+        """Bulk update channels by id, keeping the stored KPIs in sync with changed counters."""
+        if not rows:
+            return 0
+
+        # Fill in unchanged counters for the affected rows with a single SELECT
+        stale = [row['id'] for row in rows if not row.keys().isdisjoint(CHANNEL_COUNTERS)]
+        current = {}
+        if stale:
+            current = {
+                r.id: r for r in db.session.execute(
+                    select(Channel.id, *(getattr(Channel, c) for c in CHANNEL_COUNTERS))
+                    .where(Channel.id.in_(stale))
+                )
+            }
+
+        updates = []
+        for row in rows:
+            base = current.get(row['id'])
+            if base is not None:
+                counters = (row[c] if c in row else getattr(base, c) for c in CHANNEL_COUNTERS)
+                row = _with_channel_kpis(row, counters)
+            updates.append(row)
+
+        db.session.execute(update(Channel), updates)
+        _finish(flush_only)
+        return len(updates)
+
 
 class ContentRepository:
     """Repository for Content operations."""
 
     @staticmethod
-    def create(organization_id: str, title: str, content_type: str, **kwargs) -> Content:
+    def create(organization_id: str, title: str, content_type: str, flush_only: bool = False, **kwargs) -> Content:
         content = Content(organization_id=organization_id, title=title, content_type=content_type, **kwargs)
         db.session.add(content)
-        db.session.commit()
+        _finish(flush_only)
         return content
 
+    @staticmethod
+    def create_many(rows: List[Dict[str, Any]], flush_only: bool = False) -> int:
+        return _insert_many(Content, rows, flush_only)
+
     @staticmethod
     def get_by_id(content_id: str) -> Optional[Content]:
-        return Content.query.get(content_id)
+        return db.session.get(Content, content_id)
 
     @staticmethod
     def get_by_organization(org_id: str) -> List[Content]:
-        return Content.query.filter_by(organization_id=org_id).order_by(Content.created_at.desc()).all()
+        return db.session.scalars(
+            select(Content).where(Content.organization_id == org_id).order_by(Content.created_at.desc())
+        ).all()
 
     @staticmethod
     def get_by_funnel_stage(org_id: str, stage: str) -> List[Content]:
-        return Content.query.filter_by(organization_id=org_id, funnel_stage=stage).all()
+        return db.session.scalars(
+            select(Content).where(Content.organization_id == org_id, Content.funnel_stage == stage)
+        ).all()
 
     @staticmethod
-    def update(content_id: str, **kwargs) -> Optional[Content]:
-        content = Content.query.get(content_id)
+    def update(content_id: str, flush_only: bool = False, **kwargs) -> Optional[Content]:
+        content = db.session.get(Content, content_id)
         if content:
             for key, value in kwargs.items():
                 if hasattr(content, key):
                     setattr(content, key, value)
-            db.session.commit()
+            _finish(flush_only)
         return content
 
 
@@ -150,7 +283,7 @@ class MarketingMetricsRepository:
     """Repository for Marketing Metrics operations."""
 
     @staticmethod
-    def create(organization_id: str, period_start: datetime, period_end: datetime, **kwargs) -> MarketingMetrics:
+    def create(organization_id: str, period_start: datetime, period_end: datetime, flush_only: bool = False, **kwargs) -> MarketingMetrics:
         metrics = MarketingMetrics(
             organization_id=organization_id,
             period_start=period_start,
@@ -158,36 +291,49 @@ class MarketingMetricsRepository:
             **kwargs
         )
         db.session.add(metrics)
-        db.session.commit()
+        _finish(flush_only)
         return metrics
 
+    @staticmethod
+    def create_many(rows: List[Dict[str, Any]], flush_only: bool = False) -> int:
+        return _insert_many(MarketingMetrics, rows, flush_only)
+
     @staticmethod
     def get_latest(org_id: str) -> Optional[MarketingMetrics]:
-        return MarketingMetrics.query.filter_by(organization_id=org_id)\
-            .order_by(MarketingMetrics.period_end.desc()).first()
+        return db.session.scalars(
+            select(MarketingMetrics).where(MarketingMetrics.organization_id == org_id)
+            .order_by(MarketingMetrics.period_end.desc()).limit(1)
+        ).first()
 
     @staticmethod
     def get_by_period(org_id: str, period: str) -> List[MarketingMetrics]:
-        return MarketingMetrics.query.filter_by(organization_id=org_id, period=period)\
-            .order_by(MarketingMetrics.period_start.desc()).all()
+        return db.session.scalars(
+            select(MarketingMetrics)
+            .where(MarketingMetrics.organization_id == org_id, MarketingMetrics.period == period)
+            .order_by(MarketingMetrics.period_start.desc())
+        ).all()
 
 
 class BenchmarkResultRepository:
     """Repository for Benchmark Result operations."""
 
     @staticmethod
-    def create(organization_id: str, benchmark_type: str, **kwargs) -> BenchmarkResult:
+    def create(organization_id: str, benchmark_type: str, flush_only: bool = False, **kwargs) -> BenchmarkResult:
         result = BenchmarkResult(organization_id=organization_id, benchmark_type=benchmark_type, **kwargs)
         db.session.add(result)
-        db.session.commit()
+        _finish(flush_only)
         return result
 
+    @staticmethod
+    def create_many(rows: List[Dict[str, Any]], flush_only: bool = False) -> int:
+        return _insert_many(BenchmarkResult, rows, flush_only)
+
     @staticmethod
     def get_latest(org_id: str, benchmark_type: str = None) -> Optional[BenchmarkResult]:
-        query = BenchmarkResult.query.filter_by(organization_id=org_id)
+        stmt = select(BenchmarkResult).where(BenchmarkResult.organization_id == org_id)
         if benchmark_type:
-            query = query.filter_by(benchmark_type=benchmark_type)
-        return query.order_by(BenchmarkResult.created_at.desc()).first()
+            stmt = stmt.where(BenchmarkResult.benchmark_type == benchmark_type)
+        return db.session.scalars(stmt.order_by(BenchmarkResult.created_at.desc()).limit(1)).first()
 
 
 class ChatRepository:
@@ -195,7 +341,8 @@ class ChatRepository:
 
     @staticmethod
     def create_session(mode: str = 'general', organization_id: str = None,
-                       title: str = None, context: Dict = None) -> ChatSession:
+                       title: str = None, context: Dict = None,
+                       flush_only: bool = False) -> ChatSession:
         session = ChatSession(
             mode=mode,
             organization_id=organization_id,
@@ -203,43 +350,70 @@ class ChatRepository:
             context=context or {}
         )
         db.session.add(session)
-        db.session.commit()
+        _finish(flush_only)
+        # A new session has no messages or files; mark the counts loaded without a SELECT
+        set_committed_value(session, 'message_count', 0)
+        set_committed_value(session, 'file_count', 0)
         return session
 
     @staticmethod
-    def get_session(session_id: str) -> Optional[ChatSession]:
-        return ChatSession.query.get(session_id)
+    def get_session(session_id: str, with_counts: bool = False) -> Optional[ChatSession]:
+        if with_counts:
+            return db.session.scalars(
+                select(ChatSession)
+                .options(undefer(ChatSession.message_count), undefer(ChatSession.file_count))
+                .where(ChatSession.id == session_id)
+            ).first()
+        return db.session.get(ChatSession, session_id)
 
     @staticmethod
     def get_sessions(organization_id: str = None, limit: int = 20) -> List[ChatSession]:
-        query = ChatSession.query
+        stmt = select(ChatSession).options(
+            undefer(ChatSession.message_count),
+            undefer(ChatSession.file_count)
+        )
         if organization_id:
-            query = query.filter_by(organization_id=organization_id)
-        return query.order_by(ChatSession.updated_at.desc()).limit(limit).all()
+            stmt = stmt.where(ChatSession.organization_id == organization_id)
+        return db.session.scalars(stmt.order_by(ChatSession.updated_at.desc()).limit(limit)).all()
 
     @staticmethod
     def add_message(session_id: str, role: str, content: str) -> ChatMessage:
         message = ChatMessage(session_id=session_id, role=role, content=content)
         db.session.add(message)
 
-        # Update session timestamp
-        session = ChatSession.query.get(session_id)
-        if session:
-            session.updated_at = datetime.utcnow()
+        # Bump the session timestamp in SQL; no need to load the session first
+        db.session.execute(
+            update(ChatSession)
+            .where(ChatSession.id == session_id)
+            .values(updated_at=datetime.utcnow())
+        )
 
         db.session.commit()
         return message
 
     @staticmethod
-    def get_messages(session_id: str) -> List[ChatMessage]:
-        return ChatMessage.query.filter_by(session_id=session_id)\
-            .order_by(ChatMessage.created_at).all()
+    def get_messages(session_id: str, limit: int = None) -> List[ChatMessage]:
+        """Messages in chronological order; with limit, only the most recent ones."""
+        if limit is None:
+            return db.session.scalars(
+                select(ChatMessage).where(ChatMessage.session_id == session_id)
+                .order_by(ChatMessage.created_at)
+            ).all()
+        # Walk the (session_id, created_at) index backwards and stop after `limit` rows
+        recent = db.session.scalars(
+            select(ChatMessage).where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit)
+        ).all()
+        recent.reverse()
+        return recent
 
     @staticmethod
     def delete_session(session_id: str) -> bool:
-        session = ChatSession.query.get(session_id)
+        session = db.session.get(ChatSession, session_id)
         if session:
-            ChatMessage.query.filter_by(session_id=session_id).delete()
+            # Delete children explicitly: databases created before ON DELETE CASCADE keep plain FKs
+            db.session.execute(delete(ChatMessage).where(ChatMessage.session_id == session_id))
+            db.session.execute(delete(UploadedFile).where(UploadedFile.session_id == session_id))
             db.session.delete(session)
             db.session.commit()
             return True
@@ -0,0 +1,12 @@
+"""Shared row math for the demo data generators"""
+from typing import Tuple
+
+
+def channel_rates(impressions: int, clicks: int, conversions: int, spend: float) -> Tuple[float, float, float, float]:
+    """CTR %, conversion rate %, cost per click and cost per conversion, rounded for display."""
+    return (
+        round(clicks / impressions * 100, 2) if impressions > 0 else 0,
+        round(conversions / clicks * 100, 2) if clicks > 0 else 0,
+        round(spend / clicks, 2) if clicks > 0 else 0,
+        round(spend / conversions, 2) if conversions > 0 else 0,
+    )
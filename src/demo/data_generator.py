@@ -1,9 +1,20 @@
 """Demo Data Generator for Marketing Intelligence"""
+import json
 import random
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
+import os
 import uuid
 
+from ._core import channel_rates
+
+
+def _bulk_uuids(n: int, rng: Optional[random.Random] = None) -> List[str]:
+    """n random (version 4) UUID strings from one os.urandom call, or from `rng` when given."""
+    buf = rng.getrandbits(128 * n).to_bytes(16 * n, 'little') if rng else os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=buf[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
 
 class MarketingDemoGenerator:
     """Generates realistic demo data for Marketing Intelligence product."""
@@ -26,53 +37,70 @@ class MarketingDemoGenerator:
         'Manufacturing', 'Professional Services', 'Education', 'Media'
     ]
 
-    def __init__(self, seed: Optional[int] = None):
-        if seed:
-            random.seed(seed)
+    # Statuses repeat to weight the draw (3:1 active channels, 2:1:1 campaigns)
+    CHANNEL_STATUSES = ('active', 'active', 'active', 'paused')
+    CAMPAIGN_STATUSES = ('active', 'active', 'completed', 'paused')
+    CAMPAIGN_CHANNELS = tuple(CHANNEL_TYPES[:5])
+
+    def __init__(self, seed: Optional[int] = None, as_of: Optional[datetime] = None):
+        # Own RNG so concurrent requests don't reseed or interleave the global stream
+        self._seed = seed or None
+        self._rng = random.Random(self._seed)
+        # Seeded ids come from a separate stream so they don't shift the generated values
+        self._id_rng = random.Random(self._seed) if self._seed is not None else None
+        self._as_of = as_of
+
+    def _now(self) -> datetime:
+        """Timestamp for generated records: the pinned `as_of` time, else the current UTC time."""
+        return self._as_of or datetime.utcnow()
 
     def generate_organization(self, name: str = None) -> Dict[str, Any]:
         """Generate a demo organization."""
-        name = name or f"Demo Company {random.randint(1000, 9999)}"
+        name = name or f"Demo Company {self._rng.randint(1000, 9999)}"
         return {
-            'id': str(uuid.uuid4()),
+            'id': _bulk_uuids(1, self._id_rng)[0],
             'name': name,
-            'industry': random.choice(self.INDUSTRIES),
-            'monthly_budget': random.randint(10000, 500000),
-            'annual_revenue': random.randint(1000000, 100000000),
-            'employee_count': random.randint(10, 1000),
-            'created_at': datetime.utcnow().isoformat()
+            'industry': self._rng.choice(self.INDUSTRIES),
+            'monthly_budget': self._rng.randint(10000, 500000),
+            'annual_revenue': self._rng.randint(1000000, 100000000),
+            'employee_count': self._rng.randint(10, 1000),
+            'created_at': self._now().isoformat()
         }
 
     def generate_channels(self, org_id: str, count: int = 6) -> List[Dict[str, Any]]:
         """Generate marketing channel data."""
+        rng = self._rng
+        randint, uniform, choice = rng.randint, rng.uniform, rng.choice
         channels = []
-        selected_channels = random.sample(self.CHANNEL_TYPES, min(count, len(self.CHANNEL_TYPES)))
+        selected_channels = rng.sample(self.CHANNEL_TYPES, min(count, len(self.CHANNEL_TYPES)))
+
+        ids = _bulk_uuids(len(selected_channels), self._id_rng)
 
-        for channel_name in selected_channels:
-            # Generate realistic metrics with some variation
-            spend = random.randint(5000, 100000)
-            roi_multiplier = random.uniform(0.5, 4.0)
-            revenue = int(spend * roi_multiplier)
+        for channel_id, channel_name in zip(ids, selected_channels):
+            # Generate realistic metrics with some variation; spend >= 5000 keeps ROI well-defined
+            spend = randint(5000, 100000)
+            revenue = int(spend * uniform(0.5, 4.0))
 
-            impressions = random.randint(50000, 5000000)
-            clicks = int(impressions * random.uniform(0.01, 0.08))
-            conversions = int(clicks * random.uniform(0.02, 0.15))
+            impressions = randint(50000, 5000000)
+            clicks = int(impressions * uniform(0.01, 0.08))
+            conversions = int(clicks * uniform(0.02, 0.15))
+            ctr, conversion_rate, cpc, cac = channel_rates(impressions, clicks, conversions, spend)
 
             channels.append({
-                'id': str(uuid.uuid4()),
+                'id': channel_id,
                 'organization_id': org_id,
                 'name': channel_name,
                 'spend': spend,
                 'revenue': revenue,
-                'roi': round((revenue - spend) / spend * 100, 1) if spend > 0 else 0,
+                'roi': round((revenue - spend) / spend * 100, 1),
                 'impressions': impressions,
                 'clicks': clicks,
                 'conversions': conversions,
-                'ctr': round(clicks / impressions * 100, 2) if impressions > 0 else 0,
-                'conversion_rate': round(conversions / clicks * 100, 2) if clicks > 0 else 0,
-                'cpc': round(spend / clicks, 2) if clicks > 0 else 0,
-                'cac': round(spend / conversions, 2) if conversions > 0 else 0,
-                'status': random.choice(['active', 'active', 'active', 'paused']),
+                'ctr': ctr,
+                'conversion_rate': conversion_rate,
+                'cpc': cpc,
+                'cac': cac,
+                'status': choice(self.CHANNEL_STATUSES),
                 'period': 'last_30_days'
             })
 
@@ -80,22 +108,27 @@ class MarketingDemoGenerator:
 
     def generate_campaigns(self, org_id: str, count: int = 8) -> List[Dict[str, Any]]:
         """Generate campaign data."""
+        rng = self._rng
         campaigns = []
-        selected_names = random.sample(self.CAMPAIGN_NAMES, min(count, len(self.CAMPAIGN_NAMES)))
+        selected_names = rng.sample(self.CAMPAIGN_NAMES, min(count, len(self.CAMPAIGN_NAMES)))
+
+        ids = _bulk_uuids(len(selected_names), self._id_rng)
 
-        for name in selected_names:
-            start_date = datetime.utcnow() - timedelta(days=random.randint(7, 90))
-            budget = random.randint(5000, 50000)
-            spent = int(budget * random.uniform(0.3, 1.1))
-            leads = random.randint(50, 500)
-            customers = int(leads * random.uniform(0.05, 0.25))
+        now = self._now()
+
+        for campaign_id, name in zip(ids, selected_names):
+            start_date = now - timedelta(days=rng.randint(7, 90))
+            budget = rng.randint(5000, 50000)
+            spent = int(budget * rng.uniform(0.3, 1.1))
+            leads = rng.randint(50, 500)
+            customers = int(leads * rng.uniform(0.05, 0.25))
 
             campaigns.append({
-                'id': str(uuid.uuid4()),
+                'id': campaign_id,
                 'organization_id': org_id,
                 'name': name,
-                'channel': random.choice(self.CHANNEL_TYPES[:5]),
-                'status': random.choice(['active', 'active', 'completed', 'paused']),
+                'channel': rng.choice(self.CAMPAIGN_CHANNELS),
+                'status': rng.choice(self.CAMPAIGN_STATUSES),
                 'budget': budget,
                 'spent': spent,
                 'budget_utilization': round(spent / budget * 100, 1),
@@ -105,18 +138,21 @@ class MarketingDemoGenerator:
                 'cpl': round(spent / leads, 2) if leads > 0 else 0,
                 'cac': round(spent / customers, 2) if customers > 0 else 0,
                 'start_date': start_date.isoformat(),
-                'end_date': (start_date + timedelta(days=random.randint(30, 90))).isoformat()
+                'end_date': (start_date + timedelta(days=rng.randint(30, 90))).isoformat()
             })
 
         return campaigns
 
     def generate_metrics_summary(self, channels: List[Dict], campaigns: List[Dict]) -> Dict[str, Any]:
         """Generate overall marketing metrics summary."""
-        total_spend = sum(c['spend'] for c in channels)
-        total_revenue = sum(c['revenue'] for c in channels)
-        total_conversions = sum(c['conversions'] for c in channels)
-        total_impressions = sum(c['impressions'] for c in channels)
-        total_clicks = sum(c['clicks'] for c in channels)
+        # One pass over the channels for all five totals
+        total_spend = total_revenue = total_conversions = total_impressions = total_clicks = 0
+        for c in channels:
+            total_spend += c['spend']
+            total_revenue += c['revenue']
+            total_conversions += c['conversions']
+            total_impressions += c['impressions']
+            total_clicks += c['clicks']
 
         # Calculate health score based on metrics
         roas = total_revenue / total_spend if total_spend > 0 else 0
@@ -142,32 +178,35 @@ class MarketingDemoGenerator:
             'avg_ctr': round(avg_ctr, 2),
             'avg_conversion_rate': round(avg_conv_rate, 2),
             'avg_cac': round(total_spend / total_conversions, 2) if total_conversions > 0 else 0,
-            'active_campaigns': len([c for c in campaigns if c['status'] == 'active']),
+            'active_campaigns': sum(1 for c in campaigns if c['status'] == 'active'),
             'total_campaigns': len(campaigns),
-            'active_channels': len([c for c in channels if c['status'] == 'active']),
+            'active_channels': sum(1 for c in channels if c['status'] == 'active'),
             'health_score': health_score,
             'period': 'last_30_days',
-            'generated_at': datetime.utcnow().isoformat()
+            'generated_at': self._now().isoformat()
         }
 
     def generate_trends(self, days: int = 30) -> List[Dict[str, Any]]:
         """Generate daily trend data."""
+        rng = self._rng
         trends = []
-        base_spend = random.randint(500, 2000)
-        base_revenue = base_spend * random.uniform(1.5, 3.0)
+        base_spend = rng.randint(500, 2000)
+        base_revenue = base_spend * rng.uniform(1.5, 3.0)
+
+        today = self._now()
 
         for i in range(days):
-            date = datetime.utcnow() - timedelta(days=days - i - 1)
-            daily_spend = int(base_spend * random.uniform(0.7, 1.3))
-            daily_revenue = int(base_revenue * random.uniform(0.6, 1.4))
+            date = today - timedelta(days=days - i - 1)
+            daily_spend = int(base_spend * rng.uniform(0.7, 1.3))
+            daily_revenue = int(base_revenue * rng.uniform(0.6, 1.4))
 
             trends.append({
                 'date': date.strftime('%Y-%m-%d'),
                 'spend': daily_spend,
                 'revenue': daily_revenue,
-                'impressions': random.randint(5000, 50000),
-                'clicks': random.randint(100, 2000),
-                'conversions': random.randint(5, 100)
+                'impressions': rng.randint(5000, 50000),
+                'clicks': rng.randint(100, 2000),
+                'conversions': rng.randint(5, 100)
             })
 
         return trends
@@ -189,6 +228,18 @@ class MarketingDemoGenerator:
             'context_for_ai': self._build_ai_context(metrics, channels, campaigns)
         }
 
+    def generate_full_demo_json(self, org_name: str = None) -> str:
+        """Complete demo dataset serialized as JSON.
+
+        Seeded payloads are generated once per seed, name and UTC day and served
+        from cache afterwards. Their ids are drawn from the seed and their
+        timestamps are pinned to midnight UTC of that day, so a cached payload
+        matches a fresh one.
+        """
+        if self._seed is not None:
+            return _full_demo_json(self._seed, org_name, datetime.utcnow().date())
+        return json.dumps(self.generate_full_demo(org_name), separators=(',', ':'))
+
     def _build_ai_context(
         self,
         metrics: Dict[str, Any],
@@ -196,13 +247,17 @@ class MarketingDemoGenerator:
         campaigns: List[Dict]
     ) -> Dict[str, Any]:
         """Build context dictionary for AI suggestion engine."""
-        # Find best and worst performing channels
-        sorted_channels = sorted(channels, key=lambda x: x['roi'], reverse=True)
-        best_channel = sorted_channels[0] if sorted_channels else None
-        worst_channel = sorted_channels[-1] if sorted_channels else None
-
-        # Identify underperforming channels (ROI < 50%)
-        underperforming = [c for c in channels if c['roi'] < 50]
+        # Find best and worst performing channels and the underperformers (ROI < 50%) in one pass
+        best_channel = worst_channel = None
+        underperforming = []
+        for c in channels:
+            roi = c['roi']
+            if best_channel is None or roi > best_channel['roi']:
+                best_channel = c
+            if worst_channel is None or roi <= worst_channel['roi']:
+                worst_channel = c
+            if roi < 50:
+                underperforming.append(c)
 
         return {
             'roas': metrics['roas'],
@@ -216,10 +271,17 @@ class MarketingDemoGenerator:
             'worst_channel_roi': worst_channel['roi'] if worst_channel else 0,
             'underperforming_channels': [c['name'] for c in underperforming],
             'active_campaigns': metrics['active_campaigns'],
-            'campaigns_over_budget': len([c for c in campaigns if c['budget_utilization'] > 100])
+            'campaigns_over_budget': sum(1 for c in campaigns if c['budget_utilization'] > 100)
         }
 
 
+@lru_cache(maxsize=128)
+def _full_demo_json(seed, org_name: Optional[str], day: date) -> str:
+    """Serialized seeded demo payload with timestamps pinned to the start of `day`."""
+    generator = MarketingDemoGenerator(seed, as_of=datetime.combine(day, time.min))
+    return json.dumps(generator.generate_full_demo(org_name), separators=(',', ':'))
+
+
 def create_marketing_demo_generator(seed: int = None) -> MarketingDemoGenerator:
     """Factory function to create demo generator."""
     return MarketingDemoGenerator(seed)
@@ -3,9 +3,25 @@ import random
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 
+from src.demo._core import channel_rates
+
+# Revenue multiplier range and score range per campaign performance tier
+_PERF_MULTIPLIERS = {
+    'excellent': (1.2, 1.5, 85, 95),
+    'good': (0.9, 1.2, 70, 84),
+    'average': (0.6, 0.9, 50, 69),
+    'poor': (0.3, 0.6, 30, 49),
+}
+# Values repeat to weight the draw
+_CAMPAIGN_STATUSES = ('active', 'active', 'active', 'completed')
+_CHANNEL_RATINGS = ('Excellent', 'Good', 'Average')
+_CONTENT_RATINGS = ('Excellent', 'Good', 'Average', 'Good')
+_BENCHMARK_CATEGORIES = ('Brand Awareness', 'Lead Generation', 'Conversion', 'ROI', 'Content', 'Digital Presence')
+_BENCHMARK_STATUSES = ('Above', 'At', 'Below')
+
 
 def generate_demo_data(org_name: str = "Demo Company") -> Dict[str, Any]:
-    """Generate comprehensive demo data for Marketing Intelligence."""
+    """Generate comprehensive demo data for Marketing Intelligence (dates as datetime objects)."""
 
     org_id = f"demo-{random.randint(1000, 9999)}"
 
@@ -48,15 +64,10 @@ def generate_campaigns(org_id: str) -> List[Dict[str, Any]]:
         ('Webinar Promotion', 'Event', 12000, 'good'),
     ]
 
+    now = datetime.now()
     campaigns = []
     for name, ctype, budget, performance in campaign_templates:
-        perf_multipliers = {
-            'excellent': (1.2, 1.5, 85, 95),
-            'good': (0.9, 1.2, 70, 84),
-            'average': (0.6, 0.9, 50, 69),
-            'poor': (0.3, 0.6, 30, 49),
-        }
-        mult = perf_multipliers[performance]
+        mult = _PERF_MULTIPLIERS[performance]
 
         spend = budget * random.uniform(0.7, 1.0)
         impressions = int(spend * random.uniform(80, 150))
@@ -64,16 +75,16 @@ def generate_campaigns(org_id: str) -> List[Dict[str, Any]]:
         conversions = int(clicks * random.uniform(0.03, 0.08))
         revenue = spend * random.uniform(mult[0], mult[1])
 
-        start_date = datetime.now() - timedelta(days=random.randint(30, 120))
+        start_date = now - timedelta(days=random.randint(30, 120))
 
         campaigns.append({
             'id': f"camp-{random.randint(10000, 99999)}",
             'organization_id': org_id,
             'name': name,
             'campaign_type': ctype,
-            'status': random.choice(['active', 'active', 'active', 'completed']),
-            'start_date': start_date.isoformat(),
-            'end_date': (start_date + timedelta(days=random.randint(30, 90))).isoformat(),
+            'status': random.choice(_CAMPAIGN_STATUSES),
+            'start_date': start_date,
+            'end_date': start_date + timedelta(days=random.randint(30, 90)),
             'budget': budget,
             'spend': round(spend, 2),
             'impressions': impressions,
@@ -109,6 +120,7 @@ def generate_channels(org_id: str) -> List[Dict[str, Any]]:
         clicks = int(impressions * random.uniform(0.015, 0.04))
         conversions = int(clicks * random.uniform(0.02, 0.06))
         revenue = spend * (base_roas / 100) * random.uniform(0.8, 1.2) if spend > 0 else random.uniform(20000, 80000)
+        ctr, conversion_rate, cpc, cpa = channel_rates(impressions, clicks, conversions, spend)
 
         channels.append({
             'id': f"chan-{random.randint(10000, 99999)}",
@@ -123,13 +135,13 @@ def generate_channels(org_id: str) -> List[Dict[str, Any]]:
             'revenue': round(revenue, 2),
             'leads': int(conversions * random.uniform(1.5, 3)),
             'new_customers': int(conversions * random.uniform(0.3, 0.6)),
-            'ctr': round(clicks / impressions * 100, 2) if impressions > 0 else 0,
-            'conversion_rate': round(conversions / clicks * 100, 2) if clicks > 0 else 0,
-            'cpc': round(spend / clicks, 2) if clicks > 0 else 0,
-            'cpa': round(spend / conversions, 2) if conversions > 0 else 0,
+            'ctr': ctr,
+            'conversion_rate': conversion_rate,
+            'cpc': cpc,
+            'cpa': cpa,
             'roas': round(revenue / spend * 100, 1) if spend > 0 else 0,
             'efficiency_score': random.uniform(50, 95),
-            'rating': random.choice(['Excellent', 'Good', 'Average']),
+            'rating': random.choice(_CHANNEL_RATINGS),
         })
 
     return channels
@@ -150,6 +162,7 @@ def generate_content(org_id: str) -> List[Dict[str, Any]]:
         ('Product Features Overview', 'Landing Page', 'BOFU'),
     ]
 
+    now = datetime.now()
     content_items = []
     for title, ctype, stage in content_templates:
         views = random.randint(500, 15000)
@@ -161,7 +174,7 @@ def generate_content(org_id: str) -> List[Dict[str, Any]]:
             'content_type': ctype,
             'funnel_stage': stage,
             'status': 'published',
-            'publish_date': (datetime.now() - timedelta(days=random.randint(10, 180))).isoformat(),
+            'publish_date': now - timedelta(days=random.randint(10, 180)),
             'views': views,
             'unique_visitors': int(views * random.uniform(0.7, 0.9)),
             'time_on_page': random.uniform(45, 300),
@@ -174,7 +187,7 @@ def generate_content(org_id: str) -> List[Dict[str, Any]]:
             'engagement_score': random.uniform(40, 95),
             'conversion_score': random.uniform(30, 90),
             'overall_score': random.uniform(45, 90),
-            'rating': random.choice(['Excellent', 'Good', 'Average', 'Good']),
+            'rating': random.choice(_CONTENT_RATINGS),
         })
 
     return content_items
@@ -182,12 +195,13 @@ def generate_content(org_id: str) -> List[Dict[str, Any]]:
 
 def generate_marketing_metrics(org_id: str) -> Dict[str, Any]:
     """Generate overall marketing metrics."""
+    now = datetime.now()
     return {
         'id': f"metr-{random.randint(10000, 99999)}",
         'organization_id': org_id,
         'period': 'monthly',
-        'period_start': (datetime.now() - timedelta(days=30)).isoformat(),
-        'period_end': datetime.now().isoformat(),
+        'period_start': now - timedelta(days=30),
+        'period_end': now,
         'cac': round(random.uniform(80, 200), 2),
         'cpl': round(random.uniform(25, 75), 2),
         'website_traffic': random.randint(50000, 200000),
@@ -212,17 +226,13 @@ def generate_marketing_metrics(org_id: str) -> Dict[str, Any]:
 
 def generate_benchmarks(org_id: str) -> Dict[str, Any]:
     """Generate benchmark comparison data."""
-    categories = ['Brand Awareness', 'Lead Generation', 'Conversion', 'ROI', 'Content', 'Digital Presence']
-
-    category_scores = {}
-    for cat in categories:
-        category_scores[cat] = {
-            'score': random.uniform(50, 90),
-            'benchmark': 70,
-            'status': random.choice(['Above', 'At', 'Below']),
-        }
+    uniform, choice = random.uniform, random.choice
+    category_scores = {
+        cat: {'score': uniform(50, 90), 'benchmark': 70, 'status': choice(_BENCHMARK_STATUSES)}
+        for cat in _BENCHMARK_CATEGORIES
+    }
 
-    overall = sum(c['score'] for c in category_scores.values()) / len(categories)
+    overall = sum(c['score'] for c in category_scores.values()) / len(_BENCHMARK_CATEGORIES)
 
     return {
         'id': f"bench-{random.randint(10000, 99999)}",
@@ -252,138 +262,142 @@ def generate_benchmarks(org_id: str) -> Dict[str, Any]:
 
 
 def load_demo_data_to_db(db, models, org_name: str = "Acme Corp"):
-    """Load demo data into the database."""
+    """Load demo data into the database (one executemany INSERT per table, one commit)."""
+    from sqlalchemy import insert
+
     data = generate_demo_data(org_name)
 
     # Create organization
-    org = models.Organization(
-        id=data['organization']['id'],
-        name=data['organization']['name'],
-        industry=data['organization']['industry'],
-        size=data['organization']['size'],
-        annual_marketing_budget=data['organization']['annual_marketing_budget'],
-    )
-    db.session.add(org)
+    o = data['organization']
+    organization_rows = [{
+        'id': o['id'],
+        'name': o['name'],
+        'industry': o['industry'],
+        'size': o['size'],
+        'annual_marketing_budget': o['annual_marketing_budget'],
+    }]
 
     # Create campaigns
-    for c in data['campaigns']:
-        from datetime import datetime
-        campaign = models.Campaign(
-            id=c['id'],
-            organization_id=c['organization_id'],
-            name=c['name'],
-            campaign_type=c['campaign_type'],
-            status=c['status'],
-            start_date=datetime.fromisoformat(c['start_date']),
-            budget=c['budget'],
-            spend=c['spend'],
-            impressions=c['impressions'],
-            clicks=c['clicks'],
-            conversions=c['conversions'],
-            leads=c['leads'],
-            revenue=c['revenue'],
-            performance_score=c['performance_score'],
-            roi_score=c['roi_score'],
-            overall_score=c['overall_score'],
-            rating=c['rating'],
-        )
-        db.session.add(campaign)
+    campaign_rows = [{
+        'id': c['id'],
+        'organization_id': c['organization_id'],
+        'name': c['name'],
+        'campaign_type': c['campaign_type'],
+        'status': c['status'],
+        'start_date': c['start_date'],
+        'budget': c['budget'],
+        'spend': c['spend'],
+        'impressions': c['impressions'],
+        'clicks': c['clicks'],
+        'conversions': c['conversions'],
+        'leads': c['leads'],
+        'revenue': c['revenue'],
+        'performance_score': c['performance_score'],
+        'roi_score': c['roi_score'],
+        'overall_score': c['overall_score'],
+        'rating': c['rating'],
+    } for c in data['campaigns']]
 
     # Create channels
-    for ch in data['channels']:
-        channel = models.Channel(
-            id=ch['id'],
-            organization_id=ch['organization_id'],
-            name=ch['name'],
-            channel_type=ch['channel_type'],
-            status=ch['status'],
-            impressions=ch['impressions'],
-            clicks=ch['clicks'],
-            conversions=ch['conversions'],
-            spend=ch['spend'],
-            revenue=ch['revenue'],
-            leads=ch['leads'],
-            new_customers=ch['new_customers'],
-            ctr=ch['ctr'],
-            conversion_rate=ch['conversion_rate'],
-            cpc=ch['cpc'],
-            cpa=ch['cpa'],
-            roas=ch['roas'],
-            efficiency_score=ch['efficiency_score'],
-            rating=ch['rating'],
-        )
-        db.session.add(channel)
+    channel_rows = [{
+        'id': ch['id'],
+        'organization_id': ch['organization_id'],
+        'name': ch['name'],
+        'channel_type': ch['channel_type'],
+        'status': ch['status'],
+        'impressions': ch['impressions'],
+        'clicks': ch['clicks'],
+        'conversions': ch['conversions'],
+        'spend': ch['spend'],
+        'revenue': ch['revenue'],
+        'leads': ch['leads'],
+        'new_customers': ch['new_customers'],
+        'ctr': ch['ctr'],
+        'conversion_rate': ch['conversion_rate'],
+        'cpc': ch['cpc'],
+        'cpa': ch['cpa'],
+        'roas': ch['roas'],
+        'efficiency_score': ch['efficiency_score'],
+        'rating': ch['rating'],
+    } for ch in data['channels']]
 
     # Create content
-    for ct in data['content']:
-        content = models.Content(
-            id=ct['id'],
-            organization_id=ct['organization_id'],
-            title=ct['title'],
-            content_type=ct['content_type'],
-            funnel_stage=ct['funnel_stage'],
-            status=ct['status'],
-            views=ct['views'],
-            unique_visitors=ct['unique_visitors'],
-            time_on_page=ct['time_on_page'],
-            bounce_rate=ct['bounce_rate'],
-            shares=ct['shares'],
-            downloads=ct['downloads'],
-            leads_generated=ct['leads_generated'],
-            conversions=ct['conversions'],
-            engagement_score=ct['engagement_score'],
-            conversion_score=ct['conversion_score'],
-            overall_score=ct['overall_score'],
-            rating=ct['rating'],
-        )
-        db.session.add(content)
+    content_rows = [{
+        'id': ct['id'],
+        'organization_id': ct['organization_id'],
+        'title': ct['title'],
+        'content_type': ct['content_type'],
+        'funnel_stage': ct['funnel_stage'],
+        'status': ct['status'],
+        'views': ct['views'],
+        'unique_visitors': ct['unique_visitors'],
+        'time_on_page': ct['time_on_page'],
+        'bounce_rate': ct['bounce_rate'],
+        'shares': ct['shares'],
+        'downloads': ct['downloads'],
+        'leads_generated': ct['leads_generated'],
+        'conversions': ct['conversions'],
+        'engagement_score': ct['engagement_score'],
+        'conversion_score': ct['conversion_score'],
+        'overall_score': ct['overall_score'],
+        'rating': ct['rating'],
+    } for ct in data['content']]
 
     # Create metrics
     m = data['metrics']
-    from datetime import datetime
-    metrics = models.MarketingMetrics(
-        id=m['id'],
-        organization_id=m['organization_id'],
-        period=m['period'],
-        period_start=datetime.fromisoformat(m['period_start']),
-        period_end=datetime.fromisoformat(m['period_end']),
-        cac=m['cac'],
-        cpl=m['cpl'],
-        website_traffic=m['website_traffic'],
-        organic_traffic_pct=m['organic_traffic_pct'],
-        conversion_rate=m['conversion_rate'],
-        lead_to_customer_rate=m['lead_to_customer_rate'],
-        cart_abandonment_rate=m['cart_abandonment_rate'],
-        email_open_rate=m['email_open_rate'],
-        email_ctr=m['email_ctr'],
-        social_engagement_rate=m['social_engagement_rate'],
-        customer_retention_rate=m['customer_retention_rate'],
-        churn_rate=m['churn_rate'],
-        clv=m['clv'],
-        roas=m['roas'],
-        marketing_roi=m['marketing_roi'],
-        total_revenue=m['total_revenue'],
-        total_spend=m['total_spend'],
-        brand_awareness=m['brand_awareness'],
-        nps=m['nps'],
-    )
-    db.session.add(metrics)
+    metrics_rows = [{
+        'id': m['id'],
+        'organization_id': m['organization_id'],
+        'period': m['period'],
+        'period_start': m['period_start'],
+        'period_end': m['period_end'],
+        'cac': m['cac'],
+        'cpl': m['cpl'],
+        'website_traffic': m['website_traffic'],
+        'organic_traffic_pct': m['organic_traffic_pct'],
+        'conversion_rate': m['conversion_rate'],
+        'lead_to_customer_rate': m['lead_to_customer_rate'],
+        'cart_abandonment_rate': m['cart_abandonment_rate'],
+        'email_open_rate': m['email_open_rate'],
+        'email_ctr': m['email_ctr'],
+        'social_engagement_rate': m['social_engagement_rate'],
+        'customer_retention_rate': m['customer_retention_rate'],
+        'churn_rate': m['churn_rate'],
+        'clv': m['clv'],
+        'roas': m['roas'],
+        'marketing_roi': m['marketing_roi'],
+        'total_revenue': m['total_revenue'],
+        'total_spend': m['total_spend'],
+        'brand_awareness': m['brand_awareness'],
+        'nps': m['nps'],
+    }]
 
     # Create benchmark
     b = data['benchmarks']
-    benchmark = models.BenchmarkResult(
-        id=b['id'],
-        organization_id=b['organization_id'],
-        benchmark_type=b['benchmark_type'],
-        overall_score=b['overall_score'],
-        overall_rating=b['overall_rating'],
-        grade=b['grade'],
-        category_scores=b['category_scores'],
-        strengths=b['strengths'],
-        improvements=b['improvements'],
-        recommendations=b['recommendations'],
-    )
-    db.session.add(benchmark)
+    benchmark_rows = [{
+        'id': b['id'],
+        'organization_id': b['organization_id'],
+        'benchmark_type': b['benchmark_type'],
+        'overall_score': b['overall_score'],
+        'overall_rating': b['overall_rating'],
+        'grade': b['grade'],
+        'category_scores': b['category_scores'],
+        'strengths': b['strengths'],
+        'improvements': b['improvements'],
+        'recommendations': b['recommendations'],
+    }]
+
+    # Parents first so foreign keys resolve; ids are pre-generated, so no flushes are needed
+    for model, rows in (
+        (models.Organization, organization_rows),
+        (models.Campaign, campaign_rows),
+        (models.Channel, channel_rows),
+        (models.Content, content_rows),
+        (models.MarketingMetrics, metrics_rows),
+        (models.BenchmarkResult, benchmark_rows),
+    ):
+        if rows:
+            db.session.execute(insert(model), rows)
 
     db.session.commit()
 
@@ -10,17 +10,29 @@ Provides OAuth2 authentication and data fetching for:
 """
 
 import os
+import re
 import json
+import time
+import hashlib
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any, Tuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Tuple, Protocol, ClassVar
 from dataclasses import dataclass, field
 from enum import Enum
 import requests
-from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import quote_plus, urlencode
 
 logger = logging.getLogger(__name__)
 
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
 
 @dataclass
 class GoogleAnalyticsConfig:
@@ -30,17 +42,9 @@ class GoogleAnalyticsConfig:
     redirect_uri: str
     property_id: str = ""  # GA4 Property ID (format: properties/XXXXXXXX)
 
-    @property
-    def auth_url(self) -> str:
-        return "https://accounts.google.com/o/oauth2/v2/auth"
-
-    @property
-    def token_url(self) -> str:
-        return "https://oauth2.googleapis.com/token"
-
-    @property
-    def api_base_url(self) -> str:
-        return "https://analyticsdata.googleapis.com/v1beta"
+    auth_url: ClassVar[str] = "https://accounts.google.com/o/oauth2/v2/auth"
+    token_url: ClassVar[str] = "https://oauth2.googleapis.com/token"
+    api_base_url: ClassVar[str] = "https://analyticsdata.googleapis.com/v1beta"
 
     @classmethod
     def from_env(cls) -> 'GoogleAnalyticsConfig':
@@ -62,11 +66,18 @@ class GoogleToken:
     expires_in: int = 3600
     created_at: datetime = field(default_factory=datetime.utcnow)
     scope: str = ""
+    # Epoch seconds from which the token counts as expired (60s early), derived from created_at
+    _expiry_ts: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        created_at = self.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        self._expiry_ts = created_at.timestamp() + self.expires_in - 60
 
     @property
     def is_expired(self) -> bool:
-        expiry = self.created_at + timedelta(seconds=self.expires_in - 60)
-        return datetime.utcnow() >= expiry
+        return time.time() >= self._expiry_ts
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -90,6 +101,65 @@ class GoogleToken:
         )
 
 
+class TokenStore(Protocol):
+    """Persists serialized tokens (GoogleToken.to_dict) across process restarts.
+
+    Any object with these two methods works, e.g. a Redis adapter doing
+    `json.loads(redis.get(key) or 'null')` / `redis.set(key, json.dumps(data))`.
+    """
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def save(self, key: str, data: Dict[str, Any]) -> None: ...
+
+
+class FileTokenStore:
+    """Token store keeping one JSON file per key in a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f'{key}_token.json'
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.path(key)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def save(self, key: str, data: Dict[str, Any]) -> None:
+        # Write then rename, so a concurrent reader never sees a partial file
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, path)
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `max_calls` per `period` seconds, bursting up to `max_calls`"""
+
+    def __init__(self, max_calls: int = 10, period: float = 1.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._tokens = float(max_calls)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.max_calls, self._tokens + (now - self._updated) * self.max_calls / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                time.sleep((1 - self._tokens) * self.period / self.max_calls)
+
+
 class MetricType(Enum):
     """Common GA4 metrics"""
     ACTIVE_USERS = "activeUsers"
@@ -123,6 +193,53 @@ class DimensionType(Enum):
     EVENT_NAME = "eventName"
 
 
+# Metric and dimension sets of the built-in reports, resolved from the enums once at import
+_TRAFFIC_SUMMARY_METRICS = (
+    MetricType.TOTAL_USERS.value,
+    MetricType.NEW_USERS.value,
+    MetricType.SESSIONS.value,
+    MetricType.SCREEN_PAGE_VIEWS.value,
+    MetricType.AVERAGE_SESSION_DURATION.value,
+    MetricType.BOUNCE_RATE.value
+)
+_DAILY_TRAFFIC_METRICS = (MetricType.ACTIVE_USERS.value, MetricType.SESSIONS.value, MetricType.SCREEN_PAGE_VIEWS.value)
+_DEVICE_METRICS = (MetricType.ACTIVE_USERS.value, MetricType.SESSIONS.value, MetricType.BOUNCE_RATE.value)
+_LOCATION_METRICS = (MetricType.ACTIVE_USERS.value, MetricType.SESSIONS.value)
+_ACQUISITION_METRICS = (MetricType.ACTIVE_USERS.value, MetricType.NEW_USERS.value, MetricType.SESSIONS.value)
+_ACQUISITION_DIMENSIONS = (
+    DimensionType.SESSION_SOURCE.value,
+    DimensionType.SESSION_MEDIUM.value,
+    DimensionType.SESSION_CAMPAIGN.value
+)
+_TOP_PAGES_METRICS = (
+    MetricType.SCREEN_PAGE_VIEWS.value,
+    MetricType.ACTIVE_USERS.value,
+    MetricType.AVERAGE_SESSION_DURATION.value
+)
+_TOP_PAGES_DIMENSIONS = (DimensionType.PAGE_PATH.value, DimensionType.PAGE_TITLE.value)
+_LANDING_PAGE_METRICS = (
+    MetricType.SESSIONS.value,
+    MetricType.BOUNCE_RATE.value,
+    MetricType.AVERAGE_SESSION_DURATION.value
+)
+_CONVERSION_METRICS = (MetricType.CONVERSIONS.value, MetricType.SESSIONS.value)
+_GOAL_METRICS = (MetricType.EVENT_COUNT.value, MetricType.CONVERSIONS.value)
+_DATE_DIMENSIONS = (DimensionType.DATE.value,)
+_DEVICE_DIMENSIONS = (DimensionType.DEVICE_CATEGORY.value,)
+_COUNTRY_DIMENSIONS = (DimensionType.COUNTRY.value,)
+_LANDING_PAGE_DIMENSIONS = (DimensionType.LANDING_PAGE.value,)
+_EVENT_DIMENSIONS = (DimensionType.EVENT_NAME.value,)
+_SOURCE_DIMENSIONS = (DimensionType.SESSION_SOURCE.value,)
+_SESSION_CAMPAIGN = DimensionType.SESSION_CAMPAIGN.value
+
+
+def _percent_change(current: float, previous: float) -> float:
+    """Change from `previous` to `current` in percent, 0 when there is no previous value"""
+    if previous == 0:
+        return 0
+    return ((current - previous) / previous) * 100
+
+
 @dataclass
 class AnalyticsReport:
     """Analytics report result"""
@@ -179,25 +296,74 @@ class GoogleAnalyticsClient:
         'https://www.googleapis.com/auth/analytics.readonly'
     ]
 
-    def __init__(self, config: GoogleAnalyticsConfig):
+    # Concurrent report requests issued by get_marketing_summary
+    MAX_WORKERS = 8
+
+    # GA4 accepts at most this many requests per batchRunReports call
+    BATCH_SIZE = 5
+
+    # Report cache: entry limit and lifetimes (seconds) for open and closed date ranges
+    CACHE_SIZE = 256
+    CACHE_TTL_OPEN = 60
+    CACHE_TTL_CLOSED = 24 * 60 * 60
+
+    def __init__(self, config: GoogleAnalyticsConfig,
+                 token_store: Optional[TokenStore] = None,
+                 token_key: str = "google_analytics",
+                 rate_limiter: Optional[RateLimiter] = None):
         self.config = config
+        # Stay under GA4's request quotas client-side instead of burning round-trips on 429s
+        self._rate_limiter = rate_limiter or RateLimiter(max_calls=10, period=1.0)
+        self._token_store = token_store
+        self._token_key = token_key
+        self._token_lock = threading.Lock()
         self.token: Optional[GoogleToken] = None
         self._session = requests.Session()
+        # Pool enough connections for the concurrent summary workers, and back off on quota/server errors
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET", "POST"],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        self._session.mount(config.token_url, adapter)
+        self._session.mount(config.api_base_url, adapter)
+
+        # Everything in the consent URL except `state` is fixed per client
+        self._auth_url_prefix = f"{config.auth_url}?" + urlencode({
+            'client_id': config.client_id,
+            'redirect_uri': config.redirect_uri,
+            'response_type': 'code',
+            'scope': ' '.join(self.SCOPES),
+            'access_type': 'offline',
+            'prompt': 'consent'
+        })
+        self._report_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def token(self) -> Optional[GoogleToken]:
+        return self._token
+
+    @token.setter
+    def token(self, token: Optional[GoogleToken]):
+        self._token = token
+        self._request_headers = {
+            'Authorization': f'Bearer {token.access_token}',
+            'Content-Type': 'application/json'
+        } if token else {}
 
     # ========== OAuth Methods ==========
 
     def get_authorization_url(self, state: str = "") -> str:
         """Generate OAuth authorization URL for user consent"""
-        params = {
-            'client_id': self.config.client_id,
-            'redirect_uri': self.config.redirect_uri,
-            'response_type': 'code',
-            'scope': ' '.join(self.SCOPES),
-            'access_type': 'offline',
-            'prompt': 'consent',
-            'state': state
-        }
-        return f"{self.config.auth_url}?{urlencode(params)}"
+        return f"{self._auth_url_prefix}&state={quote_plus(state)}"
 
     def exchange_code_for_token(self, authorization_code: str) -> GoogleToken:
         """Exchange authorization code for access token"""
@@ -221,6 +387,7 @@ class GoogleAnalyticsClient:
             expires_in=data.get('expires_in', 3600),
             scope=data.get('scope', '')
         )
+        self._save_token()
         return self.token
 
     def refresh_access_token(self) -> GoogleToken:
@@ -247,48 +414,77 @@ class GoogleAnalyticsClient:
             expires_in=data.get('expires_in', 3600),
             scope=data.get('scope', self.token.scope)
         )
+        self._save_token()
         return self.token
 
     def set_token(self, token: GoogleToken):
         """Set token from stored credentials"""
         self.token = token
 
+    def _save_token(self):
+        if self._token_store:
+            self._token_store.save(self._token_key, self.token.to_dict())
+
+    def _load_token(self):
+        """Pick up a previously persisted token, if the store has one"""
+        if self._token_store:
+            data = self._token_store.load(self._token_key)
+            if data:
+                self.token = GoogleToken.from_dict(data)
+
     def set_property_id(self, property_id: str):
         """Set the GA4 property ID"""
         self.config.property_id = property_id
 
     def _ensure_valid_token(self):
         """Ensure we have a valid, non-expired token"""
+        if not self.token:
+            self._load_token()
         if not self.token:
             raise ValueError("No token set. Please authenticate first.")
         if self.token.is_expired:
-            self.refresh_access_token()
+            self._refresh_token_once(self.token.access_token)
+
+    def _refresh_token_once(self, stale_access_token: str):
+        """Refresh unless another thread already replaced `stale_access_token`"""
+        with self._token_lock:
+            if self.token.access_token == stale_access_token:
+                self.refresh_access_token()
 
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make authenticated API request"""
         self._ensure_valid_token()
 
         url = f"{self.config.api_base_url}/{endpoint}"
-        headers = {
-            'Authorization': f'Bearer {self.token.access_token}',
-            'Content-Type': 'application/json'
-        }
+        access_token = self.token.access_token
+        self._rate_limiter.acquire()
+        response = self._session.request(method, url, headers=self._request_headers, **kwargs)
+
+        # Token revoked or expired ahead of schedule: refresh once and retry
+        if response.status_code == 401 and self.token.refresh_token:
+            self._refresh_token_once(access_token)
+            self._rate_limiter.acquire()
+            response = self._session.request(method, url, headers=self._request_headers, **kwargs)
 
-        response = self._session.request(method, url, headers=headers, **kwargs)
         response.raise_for_status()
         return response.json()
 
     # ========== Report Methods ==========
 
-    def run_report(self, metrics: List[str], dimensions: List[str] = None,
-                   start_date: str = "30daysAgo", end_date: str = "today",
-                   limit: int = 1000) -> AnalyticsReport:
-        """Run a custom GA4 report"""
-        if not self.config.property_id:
-            raise ValueError("Property ID not set")
+
+    @staticmethod
+    def _report_request(metrics: List[str], dimensions: List[str] = None,
+                        start_date: str = "30daysAgo", end_date: str = "today",
+                        limit: int = 1000,
+                        date_ranges: Optional[List[Tuple[str, str, str]]] = None) -> Dict[str, Any]:
+        """Build a GA4 RunReportRequest body"""
+        if date_ranges:
+            ranges = [{"startDate": s, "endDate": e, "name": n} for s, e, n in date_ranges]
+        else:
+            ranges = [{"startDate": start_date, "endDate": end_date}]
 
         body = {
-            "dateRanges": [{"startDate": start_date, "endDate": end_date}],
+            "dateRanges": ranges,
             "metrics": [{"name": m} for m in metrics],
             "limit": limit
         }
@@ -296,13 +492,11 @@ class GoogleAnalyticsClient:
         if dimensions:
             body["dimensions"] = [{"name": d} for d in dimensions]
 
-        data = self._make_request(
-            'POST',
-            f'{self.config.property_id}:runReport',
-            json=body
-        )
+        return body
 
-        # Parse response
+    @staticmethod
+    def _parse_report(data: Dict[str, Any], start_date: str, end_date: str) -> AnalyticsReport:
+        """Parse a GA4 RunReportResponse into an AnalyticsReport"""
         rows = []
         dimension_headers = [h['name'] for h in data.get('dimensionHeaders', [])]
         metric_headers = [h['name'] for h in data.get('metricHeaders', [])]
@@ -333,6 +527,9 @@ class GoogleAnalyticsClient:
                     totals[metric_headers[i]] = float(total.get('value', 0))
                 except ValueError:
                     totals[metric_headers[i]] = 0
+        elif rows and not dimension_headers:
+            # Totals are only sent when requested; without dimensions the single row is the total
+            totals = {name: value for name, value in rows[0].items() if isinstance(value, float)}
 
         return AnalyticsReport(
             dimensions=dimension_headers,
@@ -343,24 +540,222 @@ class GoogleAnalyticsClient:
             totals=totals
         )
 
-    # ========== Traffic Analysis ==========
+    @staticmethod
+    def _split_date_ranges(report: AnalyticsReport,
+                           date_ranges: List[Tuple[str, str, str]]) -> Dict[str, AnalyticsReport]:
+        """Split a multi-range report into one report per named range, keyed by name"""
+        dimensions = [d for d in report.dimensions if d != 'dateRange']
+        split = {}
+        for start_date, end_date, name in date_ranges:
+            rows = [
+                {k: v for k, v in row.items() if k != 'dateRange'}
+                for row in report.rows if row.get('dateRange') == name
+            ]
+            # Without other dimensions each range has a single row, which is its total
+            totals = {k: v for k, v in rows[0].items() if isinstance(v, float)} if rows and not dimensions else {}
+            split[name] = AnalyticsReport(
+                dimensions=dimensions,
+                metrics=report.metrics,
+                rows=rows,
+                row_count=len(rows),
+                date_range=(start_date, end_date),
+                totals=totals
+            )
+        return split
 
-    def get_traffic_summary(self, start_date: str = "30daysAgo",
-                           end_date: str = "today") -> TrafficSummary:
-        """Get website traffic summary"""
-        report = self.run_report(
-            metrics=[
-                MetricType.TOTAL_USERS.value,
-                MetricType.NEW_USERS.value,
-                MetricType.SESSIONS.value,
-                MetricType.SCREEN_PAGE_VIEWS.value,
-                MetricType.AVERAGE_SESSION_DURATION.value,
-                MetricType.BOUNCE_RATE.value
-            ],
-            start_date=start_date,
-            end_date=end_date
-        )
+    def run_report(self, metrics: List[str], dimensions: List[str] = None,
+                   start_date: str = "30daysAgo", end_date: str = "today",
+                   limit: int = 1000,
+                   date_ranges: Optional[List[Tuple[str, str, str]]] = None) -> AnalyticsReport:
+        """Run a custom GA4 report.
+
+        `date_ranges` takes (start_date, end_date, name) triples instead of a single range; rows then carry
+        a 'dateRange' value naming their range, see _split_date_ranges.
+        """
+        if not self.config.property_id:
+            raise ValueError("Property ID not set")
+
+        body = self._report_request(metrics, dimensions, start_date, end_date, limit, date_ranges)
+        key = self._cache_key(body)
+        report = self._cache_get(key)
+        if report is None:
+            data = self._make_request(
+                'POST',
+                f'{self.config.property_id}:runReport',
+                json=body
+            )
+            if date_ranges:
+                start_date, end_date = date_ranges[0][:2]
+            report = self._parse_report(data, start_date, end_date)
+            self._cache_put(key, report)
+        return report
+
+    def run_batch_reports(self, specs: List[Dict[str, Any]]) -> List[AnalyticsReport]:
+        """Run several reports, each given as run_report keyword arguments, in as few requests as possible"""
+        if not self.config.property_id:
+            raise ValueError("Property ID not set")
+
+        bodies = [self._report_request(**spec) for spec in specs]
+        keys = [self._cache_key(body) for body in bodies]
+        reports = [self._cache_get(key) for key in keys]
+        missing = [i for i, report in enumerate(reports) if report is None]
+
+        for start in range(0, len(missing), self.BATCH_SIZE):
+            batch = missing[start:start + self.BATCH_SIZE]
+            if len(batch) == 1:
+                # A lone report (e.g. the rest were cached) goes to plain runReport
+                report_datas = [self._make_request(
+                    'POST',
+                    f'{self.config.property_id}:runReport',
+                    json=bodies[batch[0]]
+                )]
+            else:
+                report_datas = self._make_request(
+                    'POST',
+                    f'{self.config.property_id}:batchRunReports',
+                    json={"requests": [bodies[i] for i in batch]}
+                ).get('reports', [])
+                if len(report_datas) != len(batch):
+                    raise ValueError(
+                        f"batchRunReports returned {len(report_datas)} reports for {len(batch)} requests"
+                    )
+            for i, report_data in zip(batch, report_datas):
+                if specs[i].get('date_ranges'):
+                    start_date, end_date = specs[i]['date_ranges'][0][:2]
+                else:
+                    start_date = specs[i].get('start_date', "30daysAgo")
+                    end_date = specs[i].get('end_date', "today")
+                reports[i] = self._parse_report(report_data, start_date, end_date)
+                self._cache_put(keys[i], reports[i])
+        return reports
+
+    def _run_reports_concurrently(self, specs: List[Dict[str, Any]]) -> List[AnalyticsReport]:
+        """run_batch_reports over BATCH_SIZE chunks of `specs` in parallel; reports come back in spec order"""
+        if not specs:
+            return []
+
+        # Refresh once up front so the workers don't race on the token
+        self._ensure_valid_token()
 
+        batches = [specs[i:i + self.BATCH_SIZE] for i in range(0, len(specs), self.BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(batches))) as executor:
+            results = list(executor.map(self.run_batch_reports, batches))
+        return [report for batch in results for report in batch]
+
+    # ========== Report Cache ==========
+
+    def _cache_key(self, body: Dict[str, Any]) -> str:
+        raw = json.dumps([self.config.property_id, body], sort_keys=True)
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[AnalyticsReport]:
+        with self._cache_lock:
+            entry = self._report_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, report = entry
+            if time.monotonic() >= expires_at:
+                del self._report_cache[key]
+                return None
+            self._report_cache.move_to_end(key)
+            return report
+
+    def _cache_put(self, key: str, report: AnalyticsReport):
+        # Ranges ending on an explicit past date can't change; relative ones ("today", "7daysAgo") do
+        end_date = report.date_range[1]
+        closed = bool(_ISO_DATE.match(end_date)) and end_date < datetime.utcnow().strftime('%Y-%m-%d')
+        ttl = self.CACHE_TTL_CLOSED if closed else self.CACHE_TTL_OPEN
+
+        with self._cache_lock:
+            self._report_cache[key] = (time.monotonic() + ttl, report)
+            self._report_cache.move_to_end(key)
+            while len(self._report_cache) > self.CACHE_SIZE:
+                self._report_cache.popitem(last=False)
+
+    def cache_clear(self):
+        """Drop all cached report results"""
+        with self._cache_lock:
+            self._report_cache.clear()
+
+    # ========== Report Specs ==========
+    # run_report keyword arguments, shared by the single-report methods and the batched summary
+
+    @staticmethod
+    def _traffic_summary_spec(start_date: str, end_date: str) -> Dict[str, Any]:
+        return {
+            'metrics': _TRAFFIC_SUMMARY_METRICS,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+
+    @staticmethod
+    def _traffic_comparison_spec(start_date: str, end_date: str,
+                                 prev_start_date: str, prev_end_date: str) -> Dict[str, Any]:
+        """Traffic summary metrics for a 'current' and a 'previous' range in one report"""
+        return {
+            'metrics': _TRAFFIC_SUMMARY_METRICS,
+            'date_ranges': [
+                (start_date, end_date, 'current'),
+                (prev_start_date, prev_end_date, 'previous')
+            ]
+        }
+
+    @staticmethod
+    def _traffic_by_date_spec(start_date: str, end_date: str) -> Dict[str, Any]:
+        return {
+            'metrics': _DAILY_TRAFFIC_METRICS,
+            'dimensions': _DATE_DIMENSIONS,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+
+    @staticmethod
+    def _traffic_by_device_spec(start_date: str, end_date: str) -> Dict[str, Any]:
+        return {
+            'metrics': _DEVICE_METRICS,
+            'dimensions': _DEVICE_DIMENSIONS,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+
+    @staticmethod
+    def _traffic_by_location_spec(start_date: str, end_date: str, limit: int) -> Dict[str, Any]:
+        return {
+            'metrics': _LOCATION_METRICS,
+            'dimensions': _COUNTRY_DIMENSIONS,
+            'start_date': start_date,
+            'end_date': end_date,
+            'limit': limit
+        }
+
+    @staticmethod
+    def _acquisition_specs(start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Source, medium and campaign breakdowns, in that order"""
+        return [
+            {
+                'metrics': _ACQUISITION_METRICS,
+                'dimensions': [dimension],
+                'start_date': start_date,
+                'end_date': end_date,
+                'limit': 20
+            }
+            for dimension in _ACQUISITION_DIMENSIONS
+        ]
+
+    @staticmethod
+    def _top_pages_spec(start_date: str, end_date: str, limit: int) -> Dict[str, Any]:
+        return {
+            'metrics': _TOP_PAGES_METRICS,
+            'dimensions': _TOP_PAGES_DIMENSIONS,
+            'start_date': start_date,
+            'end_date': end_date,
+            'limit': limit
+        }
+
+    # ========== Traffic Analysis ==========
+
+    @staticmethod
+    def _to_traffic_summary(report: AnalyticsReport) -> TrafficSummary:
         totals = report.totals
         total_users = int(totals.get('totalUsers', 0))
         new_users = int(totals.get('newUsers', 0))
@@ -376,82 +771,39 @@ class GoogleAnalyticsClient:
             avg_session_duration=totals.get('averageSessionDuration', 0),
             bounce_rate=totals.get('bounceRate', 0) * 100,  # Convert to percentage
             pages_per_session=pageviews / sessions if sessions > 0 else 0,
-            date_range=(start_date, end_date)
+            date_range=report.date_range
         )
 
+    def get_traffic_summary(self, start_date: str = "30daysAgo",
+                           end_date: str = "today") -> TrafficSummary:
+        """Get website traffic summary"""
+        report = self.run_report(**self._traffic_summary_spec(start_date, end_date))
+        return self._to_traffic_summary(report)
+
     def get_traffic_by_date(self, start_date: str = "30daysAgo",
                            end_date: str = "today") -> List[Dict[str, Any]]:
         """Get daily traffic breakdown"""
-        report = self.run_report(
-            metrics=[
-                MetricType.ACTIVE_USERS.value,
-                MetricType.SESSIONS.value,
-                MetricType.SCREEN_PAGE_VIEWS.value
-            ],
-            dimensions=[DimensionType.DATE.value],
-            start_date=start_date,
-            end_date=end_date
-        )
-        return report.rows
+        return self.run_report(**self._traffic_by_date_spec(start_date, end_date)).rows
 
     def get_traffic_by_device(self, start_date: str = "30daysAgo",
                              end_date: str = "today") -> List[Dict[str, Any]]:
         """Get traffic breakdown by device category"""
-        report = self.run_report(
-            metrics=[
-                MetricType.ACTIVE_USERS.value,
-                MetricType.SESSIONS.value,
-                MetricType.BOUNCE_RATE.value
-            ],
-            dimensions=[DimensionType.DEVICE_CATEGORY.value],
-            start_date=start_date,
-            end_date=end_date
-        )
-        return report.rows
+        return self.run_report(**self._traffic_by_device_spec(start_date, end_date)).rows
 
     def get_traffic_by_location(self, start_date: str = "30daysAgo",
                                 end_date: str = "today",
                                 limit: int = 20) -> List[Dict[str, Any]]:
         """Get traffic breakdown by country"""
-        report = self.run_report(
-            metrics=[MetricType.ACTIVE_USERS.value, MetricType.SESSIONS.value],
-            dimensions=[DimensionType.COUNTRY.value],
-            start_date=start_date,
-            end_date=end_date,
-            limit=limit
-        )
-        return report.rows
+        return self.run_report(**self._traffic_by_location_spec(start_date, end_date, limit)).rows
 
     # ========== Acquisition Analysis ==========
 
     def get_acquisition_data(self, start_date: str = "30daysAgo",
                             end_date: str = "today") -> AcquisitionData:
         """Get user acquisition breakdown"""
-        # By source
-        source_report = self.run_report(
-            metrics=[MetricType.ACTIVE_USERS.value, MetricType.NEW_USERS.value, MetricType.SESSIONS.value],
-            dimensions=[DimensionType.SESSION_SOURCE.value],
-            start_date=start_date,
-            end_date=end_date,
-            limit=20
-        )
-
-        # By medium
-        medium_report = self.run_report(
-            metrics=[MetricType.ACTIVE_USERS.value, MetricType.NEW_USERS.value, MetricType.SESSIONS.value],
-            dimensions=[DimensionType.SESSION_MEDIUM.value],
-            start_date=start_date,
-            end_date=end_date,
-            limit=20
-        )
-
-        # By campaign
-        campaign_report = self.run_report(
-            metrics=[MetricType.ACTIVE_USERS.value, MetricType.NEW_USERS.value, MetricType.SESSIONS.value],
-            dimensions=[DimensionType.SESSION_CAMPAIGN.value],
-            start_date=start_date,
-            end_date=end_date,
-            limit=20
+        # By source, medium and campaign in a single batch request
+        source_report, medium_report, campaign_report = self.run_batch_reports(
+            self._acquisition_specs(start_date, end_date)
         )
 
         return AcquisitionData(
@@ -467,30 +819,15 @@ class GoogleAnalyticsClient:
                      end_date: str = "today",
                      limit: int = 20) -> List[Dict[str, Any]]:
         """Get top pages by views"""
-        report = self.run_report(
-            metrics=[
-                MetricType.SCREEN_PAGE_VIEWS.value,
-                MetricType.ACTIVE_USERS.value,
-                MetricType.AVERAGE_SESSION_DURATION.value
-            ],
-            dimensions=[DimensionType.PAGE_PATH.value, DimensionType.PAGE_TITLE.value],
-            start_date=start_date,
-            end_date=end_date,
-            limit=limit
-        )
-        return report.rows
+        return self.run_report(**self._top_pages_spec(start_date, end_date, limit)).rows
 
     def get_landing_pages(self, start_date: str = "30daysAgo",
                          end_date: str = "today",
                          limit: int = 20) -> List[Dict[str, Any]]:
         """Get top landing pages"""
         report = self.run_report(
-            metrics=[
-                MetricType.SESSIONS.value,
-                MetricType.BOUNCE_RATE.value,
-                MetricType.AVERAGE_SESSION_DURATION.value
-            ],
-            dimensions=[DimensionType.LANDING_PAGE.value],
+            metrics=_LANDING_PAGE_METRICS,
+            dimensions=_LANDING_PAGE_DIMENSIONS,
             start_date=start_date,
             end_date=end_date,
             limit=limit
@@ -502,35 +839,33 @@ class GoogleAnalyticsClient:
     def get_conversions(self, start_date: str = "30daysAgo",
                        end_date: str = "today") -> ConversionData:
         """Get conversion data"""
-        # Total conversions
-        total_report = self.run_report(
-            metrics=[MetricType.CONVERSIONS.value, MetricType.SESSIONS.value],
-            start_date=start_date,
-            end_date=end_date
-        )
+        # Totals, by event/goal and by source in a single batch request
+        total_report, goal_report, source_report = self.run_batch_reports([
+            {
+                'metrics': _CONVERSION_METRICS,
+                'start_date': start_date,
+                'end_date': end_date
+            },
+            {
+                'metrics': _GOAL_METRICS,
+                'dimensions': _EVENT_DIMENSIONS,
+                'start_date': start_date,
+                'end_date': end_date,
+                'limit': 20
+            },
+            {
+                'metrics': _CONVERSION_METRICS,
+                'dimensions': _SOURCE_DIMENSIONS,
+                'start_date': start_date,
+                'end_date': end_date,
+                'limit': 20
+            }
+        ])
 
         total_conversions = int(total_report.totals.get('conversions', 0))
         total_sessions = int(total_report.totals.get('sessions', 0))
         conversion_rate = (total_conversions / total_sessions * 100) if total_sessions > 0 else 0
 
-        # By event/goal
-        goal_report = self.run_report(
-            metrics=[MetricType.EVENT_COUNT.value, MetricType.CONVERSIONS.value],
-            dimensions=[DimensionType.EVENT_NAME.value],
-            start_date=start_date,
-            end_date=end_date,
-            limit=20
-        )
-
-        # By source
-        source_report = self.run_report(
-            metrics=[MetricType.CONVERSIONS.value, MetricType.SESSIONS.value],
-            dimensions=[DimensionType.SESSION_SOURCE.value],
-            start_date=start_date,
-            end_date=end_date,
-            limit=20
-        )
-
         return ConversionData(
             total_conversions=total_conversions,
             conversion_rate=conversion_rate,
@@ -539,6 +874,35 @@ class GoogleAnalyticsClient:
             date_range=(start_date, end_date)
         )
 
+    # ========== Dashboard ==========
+
+    def get_dashboard_data(self, start_date: str = "30daysAgo", end_date: str = "today",
+                           top_pages_limit: int = 20, geo_limit: int = 20) -> Dict[str, Any]:
+        """Get the traffic summary, acquisition, top pages and daily/device/geo breakdowns together"""
+        (traffic_report, pages_report, daily_report, device_report, geo_report,
+         source_report, medium_report, campaign_report) = self._run_reports_concurrently([
+            self._traffic_summary_spec(start_date, end_date),
+            self._top_pages_spec(start_date, end_date, top_pages_limit),
+            self._traffic_by_date_spec(start_date, end_date),
+            self._traffic_by_device_spec(start_date, end_date),
+            self._traffic_by_location_spec(start_date, end_date, geo_limit),
+            *self._acquisition_specs(start_date, end_date),
+        ])
+
+        return {
+            'traffic_summary': self._to_traffic_summary(traffic_report),
+            'acquisition': AcquisitionData(
+                by_source=source_report.rows,
+                by_medium=medium_report.rows,
+                by_campaign=campaign_report.rows,
+                date_range=(start_date, end_date)
+            ),
+            'top_pages': pages_report.rows,
+            'traffic_by_date': daily_report.rows,
+            'devices': device_report.rows,
+            'geography': geo_report.rows
+        }
+
     # ========== Marketing Summary ==========
 
     def get_marketing_summary(self, days: int = 30) -> Dict[str, Any]:
@@ -550,22 +914,31 @@ class GoogleAnalyticsClient:
         prev_end_date = f"{days + 1}daysAgo"
         prev_start_date = f"{days * 2}daysAgo"
 
-        # Current period data
-        traffic = self.get_traffic_summary(start_date, end_date)
-        acquisition = self.get_acquisition_data(start_date, end_date)
-        top_pages = self.get_top_pages(start_date, end_date, limit=10)
-        daily_traffic = self.get_traffic_by_date(start_date, end_date)
-        device_breakdown = self.get_traffic_by_device(start_date, end_date)
-        geo_breakdown = self.get_traffic_by_location(start_date, end_date, limit=10)
-
-        # Previous period for comparison
-        prev_traffic = self.get_traffic_summary(prev_start_date, prev_end_date)
-
-        # Calculate changes
-        def calc_change(current, previous):
-            if previous == 0:
-                return 0
-            return ((current - previous) / previous) * 100
+        # Eight reports in two concurrent batch requests; both traffic periods share one report
+        comparison_spec = self._traffic_comparison_spec(start_date, end_date, prev_start_date, prev_end_date)
+        (comparison_report, pages_report, daily_report, device_report, geo_report,
+         source_report, medium_report, campaign_report) = self._run_reports_concurrently([
+            comparison_spec,
+            self._top_pages_spec(start_date, end_date, 10),
+            self._traffic_by_date_spec(start_date, end_date),
+            self._traffic_by_device_spec(start_date, end_date),
+            self._traffic_by_location_spec(start_date, end_date, 10),
+            *self._acquisition_specs(start_date, end_date),
+        ])
+
+        periods = self._split_date_ranges(comparison_report, comparison_spec['date_ranges'])
+        traffic = self._to_traffic_summary(periods['current'])
+        prev_traffic = self._to_traffic_summary(periods['previous'])
+        acquisition = AcquisitionData(
+            by_source=source_report.rows,
+            by_medium=medium_report.rows,
+            by_campaign=campaign_report.rows,
+            date_range=(start_date, end_date)
+        )
+        top_pages = pages_report.rows
+        daily_traffic = daily_report.rows
+        device_breakdown = device_report.rows
+        geo_breakdown = geo_report.rows
 
         return {
             'period': {
@@ -583,16 +956,16 @@ class GoogleAnalyticsClient:
                 'bounce_rate': round(traffic.bounce_rate, 1),
                 'pages_per_session': round(traffic.pages_per_session, 2),
                 'changes': {
-                    'users': round(calc_change(traffic.total_users, prev_traffic.total_users), 1),
-                    'sessions': round(calc_change(traffic.sessions, prev_traffic.sessions), 1),
-                    'pageviews': round(calc_change(traffic.pageviews, prev_traffic.pageviews), 1),
-                    'bounce_rate': round(calc_change(traffic.bounce_rate, prev_traffic.bounce_rate), 1)
+                    'users': round(_percent_change(traffic.total_users, prev_traffic.total_users), 1),
+                    'sessions': round(_percent_change(traffic.sessions, prev_traffic.sessions), 1),
+                    'pageviews': round(_percent_change(traffic.pageviews, prev_traffic.pageviews), 1),
+                    'bounce_rate': round(_percent_change(traffic.bounce_rate, prev_traffic.bounce_rate), 1)
                 }
             },
             'acquisition': {
                 'top_sources': acquisition.by_source[:5],
                 'top_mediums': acquisition.by_medium[:5],
-                'top_campaigns': [c for c in acquisition.by_campaign[:5] if c.get(DimensionType.SESSION_CAMPAIGN.value, '(not set)') != '(not set)']
+                'top_campaigns': [c for c in acquisition.by_campaign[:5] if c.get(_SESSION_CAMPAIGN, '(not set)') != '(not set)']
             },
             'engagement': {
                 'top_pages': top_pages[:10],
@@ -609,7 +982,7 @@ class GoogleAnalyticsClient:
         alerts = []
 
         # Traffic decline alert
-        user_change = ((traffic.total_users - prev_traffic.total_users) / prev_traffic.total_users * 100) if prev_traffic.total_users > 0 else 0
+        user_change = _percent_change(traffic.total_users, prev_traffic.total_users)
         if user_change < -10:
             alerts.append({
                 'type': 'warning',
@@ -651,6 +1024,42 @@ class GoogleAnalyticsClient:
         return alerts
 
 
+# Demo value ranges per metric; float bounds draw uniformly, int bounds draw integers
+_MOCK_METRIC_RANGES = {
+    'activeUsers': (100, 5000),
+    'totalUsers': (100, 5000),
+    'newUsers': (50, 2000),
+    'sessions': (150, 7000),
+    'engagedSessions': (100, 5000),
+    'screenPageViews': (300, 15000),
+    'bounceRate': (0.3, 0.7),
+    'averageSessionDuration': (60.0, 300.0),
+    'conversions': (5, 200),
+    'eventCount': (100, 5000),
+}
+
+
+# Demo dimension values; 'date' is filled per day by _mock_dates
+_MOCK_DIMENSIONS = {
+    'country': ('United States', 'United Kingdom', 'Canada', 'Germany', 'France', 'Australia', 'India', 'Brazil', 'Japan', 'Mexico'),
+    'deviceCategory': ('desktop', 'mobile', 'tablet'),
+    'sessionSource': ('google', 'direct', 'facebook', 'linkedin', 'twitter', 'bing', 'email', 'referral'),
+    'sessionMedium': ('organic', 'cpc', 'referral', 'social', 'email', '(none)'),
+    'sessionCampaignName': ('spring_sale', 'brand_awareness', 'product_launch', 'newsletter', '(not set)'),
+    'pagePath': ('/', '/products', '/about', '/contact', '/blog', '/pricing', '/demo', '/signup'),
+    'pageTitle': ('Home', 'Products', 'About Us', 'Contact', 'Blog', 'Pricing', 'Demo', 'Sign Up'),
+    'landingPage': ('/', '/products', '/blog/article-1', '/pricing', '/demo'),
+    'eventName': ('page_view', 'scroll', 'click', 'form_submit', 'purchase', 'signup'),
+}
+
+
+@lru_cache(maxsize=1)
+def _mock_dates(day_ordinal: int) -> Tuple[str, ...]:
+    """The 30 days up to and including `day_ordinal` as GA4 YYYYMMDD strings, newest first"""
+    today = date.fromordinal(day_ordinal)
+    return tuple((today - timedelta(days=i)).strftime('%Y%m%d') for i in range(30))
+
+
 # Demo mode for testing without real Google Analytics connection
 class GoogleAnalyticsDemoClient(GoogleAnalyticsClient):
     """Demo client with mock data for testing"""
@@ -670,12 +1079,32 @@ class GoogleAnalyticsDemoClient(GoogleAnalyticsClient):
 
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Return mock data instead of making real API calls"""
-        return self._generate_mock_response(endpoint, kwargs.get('json', {}))
+        body = kwargs.get('json', {})
+        if endpoint.endswith(':batchRunReports'):
+            return {'reports': [self._generate_mock_response(endpoint, r) for r in body.get('requests', [])]}
+        return self._generate_mock_response(endpoint, body)
 
     def _generate_mock_response(self, endpoint: str, request_body: Dict) -> Dict[str, Any]:
         """Generate realistic mock GA4 response data"""
         import random
 
+        # Several date ranges: one mock response per range, tagged with a 'dateRange' dimension like GA4 does
+        date_ranges = request_body.get('dateRanges', [])
+        if len(date_ranges) > 1:
+            response = None
+            for index, date_range in enumerate(date_ranges):
+                part = self._generate_mock_response(endpoint, dict(request_body, dateRanges=[date_range]))
+                name = date_range.get('name', f'date_range_{index}')
+                for row in part['rows']:
+                    row['dimensionValues'].append({'value': name})
+                if response is None:
+                    response = part
+                    response['dimensionHeaders'].append({'name': 'dateRange'})
+                else:
+                    response['rows'].extend(part['rows'])
+                    response['totals'].extend(part['totals'])
+            return response
+
         metrics = [m['name'] for m in request_body.get('metrics', [])]
         dimensions = [d['name'] for d in request_body.get('dimensions', [])]
 
@@ -687,25 +1116,24 @@ class GoogleAnalyticsDemoClient(GoogleAnalyticsClient):
             'totals': [{'metricValues': []}]
         }
 
-        # Generate mock rows
-        num_rows = 30 if 'date' in dimensions else random.randint(5, 20)
+        # Generate mock rows; like GA4, a report without dimensions is a single row
+        if not dimensions:
+            num_rows = 1
+        else:
+            num_rows = 30 if 'date' in dimensions else random.randint(5, 20)
 
         # Mock dimension values
-        mock_dimensions = {
-            'date': [(datetime.utcnow() - timedelta(days=i)).strftime('%Y%m%d') for i in range(30)],
-            'country': ['United States', 'United Kingdom', 'Canada', 'Germany', 'France', 'Australia', 'India', 'Brazil', 'Japan', 'Mexico'],
-            'deviceCategory': ['desktop', 'mobile', 'tablet'],
-            'sessionSource': ['google', 'direct', 'facebook', 'linkedin', 'twitter', 'bing', 'email', 'referral'],
-            'sessionMedium': ['organic', 'cpc', 'referral', 'social', 'email', '(none)'],
-            'sessionCampaignName': ['spring_sale', 'brand_awareness', 'product_launch', 'newsletter', '(not set)'],
-            'pagePath': ['/', '/products', '/about', '/contact', '/blog', '/pricing', '/demo', '/signup'],
-            'pageTitle': ['Home', 'Products', 'About Us', 'Contact', 'Blog', 'Pricing', 'Demo', 'Sign Up'],
-            'landingPage': ['/', '/products', '/blog/article-1', '/pricing', '/demo'],
-            'eventName': ['page_view', 'scroll', 'click', 'form_submit', 'purchase', 'signup']
-        }
+        mock_dimensions = dict(_MOCK_DIMENSIONS, date=_mock_dates(datetime.utcnow().date().toordinal()))
 
         totals = {m: 0 for m in metrics}
 
+        # Resolve each metric's value range and sampler once, not per row
+        samplers = []
+        for metric in metrics:
+            low, high = _MOCK_METRIC_RANGES.get(metric, (10, 1000))
+            sample = random.uniform if isinstance(low, float) else random.randint
+            samplers.append((metric, sample, low, high))
+
         for i in range(min(num_rows, request_body.get('limit', 1000))):
             row = {
                 'dimensionValues': [],
@@ -722,30 +1150,8 @@ class GoogleAnalyticsDemoClient(GoogleAnalyticsClient):
                 row['dimensionValues'].append({'value': value})
 
             # Add metric values
-            for metric in metrics:
-                if metric == 'activeUsers':
-                    value = random.randint(100, 5000)
-                elif metric == 'totalUsers':
-                    value = random.randint(100, 5000)
-                elif metric == 'newUsers':
-                    value = random.randint(50, 2000)
-                elif metric == 'sessions':
-                    value = random.randint(150, 7000)
-                elif metric == 'engagedSessions':
-                    value = random.randint(100, 5000)
-                elif metric == 'screenPageViews':
-                    value = random.randint(300, 15000)
-                elif metric == 'bounceRate':
-                    value = random.uniform(0.3, 0.7)
-                elif metric == 'averageSessionDuration':
-                    value = random.uniform(60, 300)
-                elif metric == 'conversions':
-                    value = random.randint(5, 200)
-                elif metric == 'eventCount':
-                    value = random.randint(100, 5000)
-                else:
-                    value = random.randint(10, 1000)
-
+            for metric, sample, low, high in samplers:
+                value = sample(low, high)
                 row['metricValues'].append({'value': str(value)})
                 totals[metric] += value
 
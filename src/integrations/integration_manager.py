@@ -7,16 +7,19 @@ Supports Google Analytics 4, with extensibility for additional platforms.
 
 import os
 import json
+import time
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
 from .google_analytics_client import (
     GoogleAnalyticsClient, GoogleAnalyticsConfig, GoogleToken,
-    GoogleAnalyticsDemoClient, TrafficSummary, AcquisitionData
+    GoogleAnalyticsDemoClient, TrafficSummary, AcquisitionData, FileTokenStore
 )
 
 logger = logging.getLogger(__name__)
@@ -52,27 +55,42 @@ class MarketingIntegrationManager:
     - Token storage and refresh
     """
 
+    # Seconds a fetched dataset is served from memory before GA4 is asked again
+    CACHE_TTL = 300
+    # Keys carry request args (days, limit), so cap how many result sets stay in memory
+    CACHE_SIZE = 64
+
     def __init__(self, storage_path: Optional[str] = None):
         self.storage_path = storage_path or os.path.join(
             os.path.dirname(__file__), '..', '..', 'instance', 'integrations'
         )
         Path(self.storage_path).mkdir(parents=True, exist_ok=True)
+        self._token_store = FileTokenStore(self.storage_path)
 
         self._ga_client: Optional[GoogleAnalyticsClient] = None
         self._demo_mode = False
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     # ========== Configuration ==========
 
     def configure_google_analytics(self, config: Optional[GoogleAnalyticsConfig] = None):
         """Configure Google Analytics integration"""
         config = config or GoogleAnalyticsConfig.from_env()
-        self._ga_client = GoogleAnalyticsClient(config)
+        # The client saves refreshed tokens itself, so restarts skip the refresh exchange
+        self._ga_client = GoogleAnalyticsClient(
+            config,
+            token_store=self._token_store,
+            token_key=IntegrationType.GOOGLE_ANALYTICS.value
+        )
+        self.bust_cache()
         self._load_stored_token(IntegrationType.GOOGLE_ANALYTICS)
 
     def enable_demo_mode(self):
         """Enable demo mode with mock data"""
         self._demo_mode = True
         self._ga_client = GoogleAnalyticsDemoClient()
+        self.bust_cache()
 
     # ========== OAuth Authentication ==========
 
@@ -92,8 +110,7 @@ class MarketingIntegrationManager:
             if integration_type == IntegrationType.GOOGLE_ANALYTICS:
                 if not self._ga_client:
                     self.configure_google_analytics()
-                token = self._ga_client.exchange_code_for_token(authorization_code)
-                self._store_token(IntegrationType.GOOGLE_ANALYTICS, token.to_dict())
+                self._ga_client.exchange_code_for_token(authorization_code)
                 return True
 
         except Exception as e:
@@ -106,6 +123,7 @@ class MarketingIntegrationManager:
         """Set the GA4 property ID"""
         if self._ga_client:
             self._ga_client.set_property_id(property_id)
+            self.bust_cache()
             # Store property ID
             config_path = os.path.join(self.storage_path, 'ga_config.json')
             with open(config_path, 'w') as f:
@@ -119,6 +137,7 @@ class MarketingIntegrationManager:
 
         if integration_type == IntegrationType.GOOGLE_ANALYTICS:
             self._ga_client = None
+            self.bust_cache()
 
     # ========== Status ==========
 
@@ -160,142 +179,199 @@ class MarketingIntegrationManager:
 
     # ========== Data Access ==========
 
-    def get_traffic_summary(self, days: int = 30) -> Optional[Dict[str, Any]]:
+    def get_traffic_summary(self, days: int = 30, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """Get traffic summary from Google Analytics"""
         if not self._ga_client or not self._ga_client.token:
             return None
 
         try:
-            summary = self._ga_client.get_traffic_summary(
-                start_date=f"{days}daysAgo",
-                end_date="today"
-            )
-            return {
-                'total_users': summary.total_users,
-                'new_users': summary.new_users,
-                'returning_users': summary.returning_users,
-                'sessions': summary.sessions,
-                'pageviews': summary.pageviews,
-                'avg_session_duration': summary.avg_session_duration,
-                'bounce_rate': summary.bounce_rate,
-                'pages_per_session': summary.pages_per_session,
-                'date_range': summary.date_range
-            }
+            return self._cached(('traffic_summary', days), force_refresh, lambda: self._traffic_summary_dict(
+                self._ga_client.get_traffic_summary(
+                    start_date=f"{days}daysAgo",
+                    end_date="today"
+                )
+            ))
         except Exception as e:
             logger.error(f"Error fetching traffic summary: {e}")
             return None
 
-    def get_acquisition_data(self, days: int = 30) -> Optional[Dict[str, Any]]:
+    def get_acquisition_data(self, days: int = 30, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """Get acquisition breakdown from Google Analytics"""
         if not self._ga_client or not self._ga_client.token:
             return None
 
         try:
-            data = self._ga_client.get_acquisition_data(
-                start_date=f"{days}daysAgo",
-                end_date="today"
-            )
-            return {
-                'by_source': data.by_source,
-                'by_medium': data.by_medium,
-                'by_campaign': data.by_campaign,
-                'date_range': data.date_range
-            }
+            return self._cached(('acquisition', days), force_refresh, lambda: self._acquisition_dict(
+                self._ga_client.get_acquisition_data(
+                    start_date=f"{days}daysAgo",
+                    end_date="today"
+                )
+            ))
         except Exception as e:
             logger.error(f"Error fetching acquisition data: {e}")
             return None
 
-    def get_top_pages(self, days: int = 30, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+    def get_top_pages(self, days: int = 30, limit: int = 20,
+                      force_refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
         """Get top pages from Google Analytics"""
         if not self._ga_client or not self._ga_client.token:
             return None
 
         try:
-            return self._ga_client.get_top_pages(
+            return self._cached(('top_pages', days, limit), force_refresh, lambda: self._ga_client.get_top_pages(
                 start_date=f"{days}daysAgo",
                 end_date="today",
                 limit=limit
-            )
+            ))
         except Exception as e:
             logger.error(f"Error fetching top pages: {e}")
             return None
 
-    def get_traffic_by_date(self, days: int = 30) -> Optional[List[Dict[str, Any]]]:
+    def get_traffic_by_date(self, days: int = 30, force_refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
         """Get daily traffic trend"""
         if not self._ga_client or not self._ga_client.token:
             return None
 
         try:
-            return self._ga_client.get_traffic_by_date(
+            return self._cached(('traffic_by_date', days), force_refresh, lambda: self._ga_client.get_traffic_by_date(
                 start_date=f"{days}daysAgo",
                 end_date="today"
-            )
+            ))
         except Exception as e:
             logger.error(f"Error fetching daily traffic: {e}")
             return None
 
-    def get_device_breakdown(self, days: int = 30) -> Optional[List[Dict[str, Any]]]:
+    def get_device_breakdown(self, days: int = 30, force_refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
         """Get traffic by device category"""
         if not self._ga_client or not self._ga_client.token:
             return None
 
         try:
-            return self._ga_client.get_traffic_by_device(
+            return self._cached(('devices', days), force_refresh, lambda: self._ga_client.get_traffic_by_device(
                 start_date=f"{days}daysAgo",
                 end_date="today"
-            )
+            ))
         except Exception as e:
             logger.error(f"Error fetching device breakdown: {e}")
             return None
 
-    def get_geo_breakdown(self, days: int = 30, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+    def get_geo_breakdown(self, days: int = 30, limit: int = 20,
+                          force_refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
         """Get traffic by location"""
         if not self._ga_client or not self._ga_client.token:
             return None
 
         try:
-            return self._ga_client.get_traffic_by_location(
+            return self._cached(('geography', days, limit), force_refresh, lambda: self._ga_client.get_traffic_by_location(
                 start_date=f"{days}daysAgo",
                 end_date="today",
                 limit=limit
-            )
+            ))
         except Exception as e:
             logger.error(f"Error fetching geo breakdown: {e}")
             return None
 
-    def get_marketing_summary(self, days: int = 30) -> Dict[str, Any]:
+    def get_dashboard_bundle(self, days: int = 30, top_pages_limit: int = 20, geo_limit: int = 20,
+                             force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Get all dashboard datasets at once: two concurrent GA4 batch requests instead of six calls"""
+        if not self._ga_client or not self._ga_client.token:
+            return None
+
+        def fetch():
+            data = self._ga_client.get_dashboard_data(
+                start_date=f"{days}daysAgo",
+                end_date="today",
+                top_pages_limit=top_pages_limit,
+                geo_limit=geo_limit
+            )
+            return {
+                'traffic_summary': self._traffic_summary_dict(data['traffic_summary']),
+                'acquisition': self._acquisition_dict(data['acquisition']),
+                'top_pages': data['top_pages'],
+                'traffic_trend': data['traffic_by_date'],
+                'devices': data['devices'],
+                'geography': data['geography']
+            }
+
+        try:
+            return self._cached(('dashboard', days, top_pages_limit, geo_limit), force_refresh, fetch)
+        except Exception as e:
+            logger.error(f"Error fetching dashboard data: {e}")
+            return None
+
+    def get_marketing_summary(self, days: int = 30, force_refresh: bool = False) -> Dict[str, Any]:
         """Get comprehensive marketing analytics summary"""
         if not self._ga_client or not self._ga_client.token:
             return {'error': 'Not connected to Google Analytics'}
 
         try:
-            return self._ga_client.get_marketing_summary(days=days)
+            return self._cached(('marketing_summary', days), force_refresh,
+                                lambda: self._ga_client.get_marketing_summary(days=days))
         except Exception as e:
             logger.error(f"Error fetching marketing summary: {e}")
             return {'error': str(e)}
 
+    # ========== Caching ==========
+
+    def _cached(self, key: tuple, force_refresh: bool, fetch: Callable[[], Any]) -> Any:
+        """Return the fresh cached result for `key` (scoped to the current property), else fetch and store it"""
+        key = (self._ga_client.config.property_id,) + key
+        now = time.monotonic()
+        if not force_refresh:
+            with self._cache_lock:
+                entry = self._cache.get(key)
+                if entry and now - entry[0] < self.CACHE_TTL:
+                    self._cache.move_to_end(key)
+                    return entry[1]
+
+        result = fetch()
+        with self._cache_lock:
+            self._cache[key] = (now, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def bust_cache(self):
+        """Forget all cached datasets"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _traffic_summary_dict(summary: TrafficSummary) -> Dict[str, Any]:
+        return {
+            'total_users': summary.total_users,
+            'new_users': summary.new_users,
+            'returning_users': summary.returning_users,
+            'sessions': summary.sessions,
+            'pageviews': summary.pageviews,
+            'avg_session_duration': summary.avg_session_duration,
+            'bounce_rate': summary.bounce_rate,
+            'pages_per_session': summary.pages_per_session,
+            'date_range': summary.date_range
+        }
+
+    @staticmethod
+    def _acquisition_dict(data: AcquisitionData) -> Dict[str, Any]:
+        return {
+            'by_source': data.by_source,
+            'by_medium': data.by_medium,
+            'by_campaign': data.by_campaign,
+            'date_range': data.date_range
+        }
+
     # ========== Token Storage ==========
 
     def _get_token_path(self, integration_type: IntegrationType) -> str:
         """Get the file path for storing tokens"""
-        return os.path.join(self.storage_path, f'{integration_type.value}_token.json')
-
-    def _store_token(self, integration_type: IntegrationType, token_data: Dict[str, Any]):
-        """Store OAuth token to file"""
-        token_path = self._get_token_path(integration_type)
-        with open(token_path, 'w') as f:
-            json.dump(token_data, f)
+        return str(self._token_store.path(integration_type.value))
 
     def _load_stored_token(self, integration_type: IntegrationType):
         """Load stored OAuth token from file"""
-        token_path = self._get_token_path(integration_type)
-
-        if not os.path.exists(token_path):
-            return
-
         try:
-            with open(token_path, 'r') as f:
-                token_data = json.load(f)
+            token_data = self._token_store.load(integration_type.value)
+            if not token_data:
+                return
 
             if integration_type == IntegrationType.GOOGLE_ANALYTICS and self._ga_client:
                 self._ga_client.set_token(GoogleToken.from_dict(token_data))
@@ -7,7 +7,8 @@ from flask import Flask, render_template, request, jsonify, Response, stream_wit
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import get_config
-from src.database.models import db, Organization, Campaign, Channel, Content, MarketingMetrics, BenchmarkResult, ChatSession, ChatMessage, UploadedFile
+from src.database.models import db, create_missing_indexes, Organization, Campaign, Channel, Content, MarketingMetrics, BenchmarkResult, ChatSession, ChatMessage, UploadedFile
+from src.database._perf import init_query_budget
 from src.database.repository import OrganizationRepository, CampaignRepository, ChannelRepository, ContentRepository, ChatRepository, BenchmarkResultRepository
 from src.ai_core.chat_engine import ChatEngine, ConversationMode
 from src.ai_core.file_analyzer import create_file_analyzer
@@ -28,11 +29,17 @@ def create_app():
     config = get_config()
     app.config.from_object(config)
 
+    # to_dict() payloads are already built in a stable order; skip re-sorting every key
+    app.json.sort_keys = False
+
     # Initialize database
     db.init_app(app)
 
     with app.app_context():
         db.create_all()
+        create_missing_indexes()
+        if app.debug:
+            init_query_budget(app, db.engine)
 
     init_ui(app,
         product_name="Marketing Intelligence",
@@ -225,6 +232,16 @@ def create_app():
             return jsonify({'error': 'No data available'}), 400
         return jsonify(devices)
 
+    @app.route('/api/integrations/dashboard')
+    def api_integration_dashboard():
+        """Get all integration dashboard datasets in one request."""
+        days = request.args.get('days', 30, type=int)
+        limit = request.args.get('limit', 20, type=int)
+        bundle = integration_manager.get_dashboard_bundle(days=days, top_pages_limit=limit)
+        if not bundle:
+            return jsonify({'error': 'No data available'}), 400
+        return jsonify(bundle)
+
     @app.route('/api/integrations/marketing-summary')
     def api_marketing_summary():
         """Get comprehensive marketing analytics summary."""
@@ -341,7 +358,7 @@ def create_app():
             success = ChatRepository.delete_session(session_id)
             return jsonify({'success': success})
 
-        session = ChatRepository.get_session(session_id)
+        session = ChatRepository.get_session(session_id, with_counts=True)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
@@ -367,8 +384,8 @@ def create_app():
         # Save user message
         ChatRepository.add_message(session_id, 'user', user_message)
 
-        # Get conversation history
-        messages = ChatRepository.get_messages(session_id)
+        # Get conversation history (only the window the model sees, plus the new message)
+        messages = ChatRepository.get_messages(session_id, limit=ChatEngine.HISTORY_WINDOW + 1)
         history = [{'role': m.role, 'content': m.content} for m in messages[:-1]]
 
         # Get mode and context
@@ -399,8 +416,8 @@ def create_app():
         # Save user message
         ChatRepository.add_message(session_id, 'user', user_message)
 
-        # Get history
-        messages = ChatRepository.get_messages(session_id)
+        # Get history (only the window the model sees, plus the new message)
+        messages = ChatRepository.get_messages(session_id, limit=ChatEngine.HISTORY_WINDOW + 1)
         history = [{'role': m.role, 'content': m.content} for m in messages[:-1]]
 
         mode = ConversationMode(session.mode) if session.mode else ConversationMode.GENERAL
@@ -435,12 +452,12 @@ def create_app():
         if not chat_engine:
             return jsonify({'suggestions': [], 'error': 'Chat engine not available'}), 503
 
-        session = ChatRepository.get_session(session_id)
+        session = ChatRepository.get_session(session_id, with_counts=True)
         if not session:
             return jsonify({'error': 'Session not found'}), 404
 
-        # Get conversation history
-        messages = ChatRepository.get_messages(session_id)
+        # Get recent conversation history; suggestions only look at the latest turns
+        messages = ChatRepository.get_messages(session_id, limit=ChatEngine.HISTORY_WINDOW)
         history = [{'role': m.role, 'content': m.content} for m in messages]
 
         # Build context from session
@@ -465,7 +482,7 @@ def create_app():
             'context_summary': {
                 'mode': session.mode,
                 'discussed_topics': discussed_topics,
-                'message_count': len(messages)
+                'message_count': session.message_count or 0
             }
         })
 
@@ -593,6 +610,48 @@ def create_app():
 
     # ==================== DASHBOARD API ====================
 
+    def performance_data(org_id):
+        """Channel/campaign rows plus org-level rollup for dashboard, export and alerts."""
+        channels = ChannelRepository.get_performance_rows(org_id)
+        campaigns = CampaignRepository.get_performance_rows(org_id)
+
+        # Roll up totals in the same pass that builds the channel payload
+        total_revenue = total_spend = total_conversions = 0
+        channel_data = []
+        for c in channels:
+            spend = c.spend or 0
+            revenue = c.revenue or 0
+            conversions = c.conversions or 0
+            total_revenue += revenue
+            total_spend += spend
+            total_conversions += conversions
+            channel_data.append({
+                'name': c.name,
+                'spend': spend,
+                'revenue': revenue,
+                'conversions': conversions,
+                'roi': round((c.revenue - c.spend) / c.spend * 100, 1) if c.spend and c.spend > 0 else 0
+            })
+        roas = round(total_revenue / total_spend, 2) if total_spend > 0 else 0
+
+        return {
+            'metrics': {
+                'total_revenue': total_revenue,
+                'total_spend': total_spend,
+                'roas': roas,
+                'total_conversions': total_conversions
+            },
+            'channels': channel_data,
+            'campaigns': [{
+                'name': c.name,
+                'channel': c.channel,
+                'status': c.status,
+                'budget': c.budget or 0,
+                'spent': c.spent or 0,
+                'leads': c.leads or 0
+            } for c in campaigns]
+        }
+
     @app.route('/api/dashboard/<org_id>')
     def api_dashboard_data(org_id):
         """Get dashboard data for an organization."""
@@ -600,34 +659,10 @@ def create_app():
         if not org:
             return jsonify({'error': 'Organization not found'}), 404
 
-        channels = ChannelRepository.get_by_organization(org_id)
-        campaigns = CampaignRepository.get_by_organization(org_id)
+        data = performance_data(org_id)
         benchmark = BenchmarkResultRepository.get_latest(org_id)
-
-        # Calculate metrics
-        total_revenue = sum(c.revenue or 0 for c in channels)
-        total_spend = sum(c.spend or 0 for c in channels)
-        total_conversions = sum(c.conversions or 0 for c in channels)
-        roas = round(total_revenue / total_spend, 2) if total_spend > 0 else 0
-
-        # Channel data for charts
-        channel_data = [{
-            'name': c.name,
-            'spend': c.spend or 0,
-            'revenue': c.revenue or 0,
-            'conversions': c.conversions or 0,
-            'roi': round((c.revenue - c.spend) / c.spend * 100, 1) if c.spend and c.spend > 0 else 0
-        } for c in channels]
-
-        # Campaign data for charts
-        campaign_data = [{
-            'name': c.name,
-            'channel': c.channel,
-            'status': c.status,
-            'budget': c.budget or 0,
-            'spent': c.spent or 0,
-            'leads': c.leads or 0
-        } for c in campaigns]
+        total_revenue = data['metrics']['total_revenue']
+        total_spend = data['metrics']['total_spend']
 
         # Trend data (mock for now - in production, query historical data)
         import random
@@ -639,14 +674,9 @@ def create_app():
 
         return jsonify({
             'organization': org.to_dict(),
-            'metrics': {
-                'total_revenue': total_revenue,
-                'total_spend': total_spend,
-                'roas': roas,
-                'total_conversions': total_conversions
-            },
-            'channels': channel_data,
-            'campaigns': campaign_data,
+            'metrics': data['metrics'],
+            'channels': data['channels'],
+            'campaigns': data['campaigns'],
             'trend_data': trend_data,
             'benchmark': benchmark.to_dict() if benchmark else None
         })
@@ -661,37 +691,7 @@ def create_app():
         if not org:
             return jsonify({'error': 'Organization not found'}), 404
 
-        channels = ChannelRepository.get_by_organization(org_id)
-        campaigns = CampaignRepository.get_by_organization(org_id)
-
-        total_revenue = sum(c.revenue or 0 for c in channels)
-        total_spend = sum(c.spend or 0 for c in channels)
-        total_conversions = sum(c.conversions or 0 for c in channels)
-        roas = round(total_revenue / total_spend, 2) if total_spend > 0 else 0
-
-        data = {
-            'metrics': {
-                'total_revenue': total_revenue,
-                'total_spend': total_spend,
-                'roas': roas,
-                'total_conversions': total_conversions
-            },
-            'channels': [{
-                'name': c.name,
-                'spend': c.spend or 0,
-                'revenue': c.revenue or 0,
-                'conversions': c.conversions or 0,
-                'roi': round((c.revenue - c.spend) / c.spend * 100, 1) if c.spend and c.spend > 0 else 0
-            } for c in channels],
-            'campaigns': [{
-                'name': c.name,
-                'channel': c.channel,
-                'status': c.status,
-                'budget': c.budget or 0,
-                'spent': c.spent or 0,
-                'leads': c.leads or 0
-            } for c in campaigns]
-        }
+        data = performance_data(org_id)
 
         report_type = request.args.get('type', 'full')
         csv_content = report_generator.generate_csv(data, report_type)
@@ -709,37 +709,7 @@ def create_app():
         if not org:
             return jsonify({'error': 'Organization not found'}), 404
 
-        channels = ChannelRepository.get_by_organization(org_id)
-        campaigns = CampaignRepository.get_by_organization(org_id)
-
-        total_revenue = sum(c.revenue or 0 for c in channels)
-        total_spend = sum(c.spend or 0 for c in channels)
-        total_conversions = sum(c.conversions or 0 for c in channels)
-        roas = round(total_revenue / total_spend, 2) if total_spend > 0 else 0
-
-        data = {
-            'metrics': {
-                'total_revenue': total_revenue,
-                'total_spend': total_spend,
-                'roas': roas,
-                'total_conversions': total_conversions
-            },
-            'channels': [{
-                'name': c.name,
-                'spend': c.spend or 0,
-                'revenue': c.revenue or 0,
-                'conversions': c.conversions or 0,
-                'roi': round((c.revenue - c.spend) / c.spend * 100, 1) if c.spend and c.spend > 0 else 0
-            } for c in channels],
-            'campaigns': [{
-                'name': c.name,
-                'channel': c.channel,
-                'status': c.status,
-                'budget': c.budget or 0,
-                'spent': c.spent or 0,
-                'leads': c.leads or 0
-            } for c in campaigns]
-        }
+        data = performance_data(org_id)
 
         html_content = report_generator.generate_html_report(data, org.name)
         return Response(html_content, mimetype='text/html')
@@ -753,37 +723,7 @@ def create_app():
         if not org:
             return jsonify({'error': 'Organization not found'}), 404
 
-        channels = ChannelRepository.get_by_organization(org_id)
-        campaigns = CampaignRepository.get_by_organization(org_id)
-
-        total_revenue = sum(c.revenue or 0 for c in channels)
-        total_spend = sum(c.spend or 0 for c in channels)
-        total_conversions = sum(c.conversions or 0 for c in channels)
-        roas = round(total_revenue / total_spend, 2) if total_spend > 0 else 0
-
-        data = {
-            'metrics': {
-                'total_revenue': total_revenue,
-                'total_spend': total_spend,
-                'roas': roas,
-                'total_conversions': total_conversions
-            },
-            'channels': [{
-                'name': c.name,
-                'spend': c.spend or 0,
-                'revenue': c.revenue or 0,
-                'conversions': c.conversions or 0,
-                'roi': round((c.revenue - c.spend) / c.spend * 100, 1) if c.spend and c.spend > 0 else 0
-            } for c in channels],
-            'campaigns': [{
-                'name': c.name,
-                'channel': c.channel,
-                'status': c.status,
-                'budget': c.budget or 0,
-                'spent': c.spent or 0,
-                'leads': c.leads or 0
-            } for c in campaigns]
-        }
+        data = performance_data(org_id)
 
         alerts = alert_engine.check_metrics(data)
         summary = alert_engine.get_alert_summary(alerts)
@@ -803,9 +743,7 @@ def create_app():
         seed = data.get('seed')
 
         generator = create_marketing_demo_generator(seed)
-        demo_data = generator.generate_full_demo(org_name)
-
-        return jsonify(demo_data)
+        return Response(generator.generate_full_demo_json(org_name), mimetype='application/json')
 
     @app.route('/api/demo/load', methods=['POST'])
     def api_load_demo():
@@ -817,38 +755,43 @@ def create_app():
         generator = create_marketing_demo_generator(seed)
         demo_data = generator.generate_full_demo(org_name)
 
-        # Create organization
+        # Create organization; flush only so the whole load commits once
         org = OrganizationRepository.create(
             name=demo_data['organization']['name'],
             industry=demo_data['organization']['industry'],
-            annual_marketing_budget=demo_data['organization']['monthly_budget'] * 12
+            annual_marketing_budget=demo_data['organization']['monthly_budget'] * 12,
+            flush_only=True
         )
 
         # Create channels
-        for channel_data in demo_data['channels']:
-            ChannelRepository.create(
-                organization_id=org.id,
-                name=channel_data['name'],
-                channel_type=channel_data['name'].lower().replace(' ', '_'),
-                status=channel_data['status'],
-                spend=channel_data['spend'],
-                revenue=channel_data['revenue'],
-                impressions=channel_data['impressions'],
-                clicks=channel_data['clicks'],
-                conversions=channel_data['conversions']
-            )
+        ChannelRepository.create_many([
+            {
+                'organization_id': org.id,
+                'name': channel_data['name'],
+                'channel_type': channel_data['name'].lower().replace(' ', '_'),
+                'status': channel_data['status'],
+                'spend': channel_data['spend'],
+                'revenue': channel_data['revenue'],
+                'impressions': channel_data['impressions'],
+                'clicks': channel_data['clicks'],
+                'conversions': channel_data['conversions']
+            }
+            for channel_data in demo_data['channels']
+        ], flush_only=True)
 
         # Create campaigns
-        for campaign_data in demo_data['campaigns']:
-            CampaignRepository.create(
-                organization_id=org.id,
-                name=campaign_data['name'],
-                channel=campaign_data['channel'],
-                status=campaign_data['status'],
-                budget=campaign_data['budget'],
-                spent=campaign_data['spent'],
-                leads=campaign_data['leads']
-            )
+        CampaignRepository.create_many([
+            {
+                'organization_id': org.id,
+                'name': campaign_data['name'],
+                'campaign_type': campaign_data['channel'],
+                'status': campaign_data['status'],
+                'budget': campaign_data['budget'],
+                'spend': campaign_data['spent'],
+                'leads': campaign_data['leads']
+            }
+            for campaign_data in demo_data['campaigns']
+        ])
 
         return jsonify({
             'success': True,